@@ -4,6 +4,10 @@ import platform
 import subprocess
 from subprocess import run, CalledProcessError
 import sys
+import time
+from utils.startup import page_load_csv, page_load_report, record_page_load
+
+started = time.perf_counter()
 
 # Ensure correct event loop policy for Windows
 if platform.system() == "Windows":
@@ -56,3 +60,15 @@ st.markdown("""
 📧 Email: [support@restauconcept.com](mailto:support@restauconcept.com)  
 📞 Phone: +1-234-567-890
 """)
+
+# Load times of the pages opened since the server started (rendered on demand, tables are slow to first render)
+if st.toggle("Show page load times"):
+    report = page_load_report()
+    if report:
+        st.dataframe(report, use_container_width=True, hide_index=True)
+        st.download_button("Download load times (CSV)", page_load_csv(), file_name="page_load_times.csv", mime="text/csv")
+    else:
+        st.caption("No page opened yet.")
+    st.caption("Cold is the first load of a page in this server process; warm loads are its later reruns.")
+
+record_page_load("Home", time.perf_counter() - started)
@@ -0,0 +1,394 @@
+"""
+Local stand-in for the RestauConcept admin back office, for offline benchmarks.
+
+Serves logon.asp, default.asp, the SA_prod.asp search with a paginated
+`table.listTable` and "Suiv." links, and a SA_prodEdit.asp edit page with the
+`prodForm` form (multipart, with a multiple select, a textarea, a disabled
+field and a file input, every posted field replacing the stored value), over
+a generated catalog. Latency and server errors can be
+injected. Point the tools at it with RESTAUCONCEPT_ADMIN_URL:
+
+    python -m benchmarks.mock_admin --products 5000 --latency 0.05 --port 8765
+    RESTAUCONCEPT_ADMIN_URL=http://127.0.0.1:8765/admin/ streamlit run Home.py
+"""
+import argparse
+import html
+import logging
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+logger = logging.getLogger(__name__)
+
+ADMIN_PATH = "/admin/"
+SESSION_COOKIE = "ASPSESSIONIDMOCK"
+DEFAULT_PAGE_SIZE = 50
+# Page number links shown around the current page, like the real listing
+PAGE_LINK_WINDOW = 10
+FOOTER = '<td align="center" style="background-color:#eeeeee">© Copyright 2025 - Restoconcept</td>'
+CATEGORIES = ["Cuisson", "Froid", "Laverie", "Préparation", "Snacking", "Vitrines"]
+# Read-only fields of prodForm: a browser does not submit them, so posting one is rejected
+DISABLED_FIELDS = ("created",)
+
+
+class MockCatalog:
+    """Generated products spread over a few marques."""
+
+    def __init__(self, products=1000, marques=5, seed=0):
+        rng = random.Random(seed)
+        self.marques = [f"Marque {number}" for number in range(1, marques + 1)]
+        self.products = {}
+        for product_id in range(1, products + 1):
+            self.products[product_id] = {
+                "id": product_id,
+                "reference": f"REF{product_id:06d}",
+                "name": f"Produit {product_id}",
+                "marque": self.marques[(product_id - 1) % marques],
+                "price": f"{rng.uniform(5, 2500):.2f}".replace(".", ","),
+                "active": True,
+                "categories": sorted(rng.sample(CATEGORIES, 2)),
+                "description": f"Produit {product_id}\nGarantie 1 an",
+            }
+        self.lock = threading.Lock()
+
+    def search(self, marque="", phrase=""):
+        phrase = phrase.strip().lower()
+        return [
+            product for product in self.products.values()
+            if (not marque or product["marque"] == marque) and (not phrase or phrase in product["reference"].lower())
+        ]
+
+
+class MockAdminServer:
+    """
+    Runs the mock admin on a background thread.
+
+    Args:
+        products: Catalog size.
+        marques: Number of marques the products are spread over.
+        page_size: Rows per result page.
+        latency: Seconds added to every page, plus up to `jitter` seconds at random.
+        error_rate: Fraction of requests (logon excepted) answered with a 500.
+        username, password: Accepted credentials; any non-empty ones when None.
+        port: 0 picks a free port.
+        marque_ids: Use the marque numbers as the values of the marque options, like ids, instead of their names.
+    """
+
+    def __init__(
+        self, products=1000, marques=5, page_size=DEFAULT_PAGE_SIZE, latency=0.0, jitter=0.0, error_rate=0.0,
+        username=None, password=None, host="127.0.0.1", port=0, seed=0, marque_ids=False,
+    ):
+        self.catalog = MockCatalog(products, marques, seed)
+        self.marque_ids = marque_ids
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.username = username
+        self.password = password
+        self.sessions = set()
+        self.requests = Counter()
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{ADMIN_PATH}"
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-admin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def check_credentials(self, username, password):
+        if self.username is None:
+            return bool(username and password)
+        return username == self.username and password == self.password
+
+    def delay_and_fail(self):
+        """Sleeps the injected latency; returns True when this request should fail."""
+        with self._lock:
+            delay = self.latency + self._rng.uniform(0, self.jitter) if self.jitter else self.latency
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return fail
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, keep-alive requests stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    @property
+    def mock(self):
+        return self.server.mock
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    # Request plumbing
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        parts = urlsplit(self.path)
+        self.query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        # Posted fields in order (repeated for multiple selects), and the first value of each in `form`
+        self.form_fields = []
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            self.form_fields = self._parse_body(self.rfile.read(length))
+        self.form = {}
+        for key, value in self.form_fields:
+            self.form.setdefault(key, value)
+        name = parts.path[len(ADMIN_PATH):] if parts.path.startswith(ADMIN_PATH) else None
+        with self.mock._lock:
+            self.mock.requests[name or parts.path] += 1
+
+        routes = {
+            "logon.asp": self._logon,
+            "default.asp": self._default,
+            "SA_prod.asp": self._product_search,
+            "SA_prodEdit.asp": self._product_edit,
+        }
+        handler = routes.get(name)
+        if handler is None:
+            self._send(404, "<html><body>Not found</body></html>")
+            return
+        if self.mock.delay_and_fail() and name != "logon.asp":
+            with self.mock._lock:
+                self.mock.errors += 1
+            self._send(500, "<html><body>Internal Server Error</body></html>")
+            return
+        if name != "logon.asp" and not self._logged_in():
+            self._redirect("logon.asp")
+            return
+        handler(method)
+
+    def _parse_body(self, body):
+        content_type = self.headers.get("Content-Type") or ""
+        if not content_type.startswith("multipart/form-data"):
+            return parse_qsl(body.decode("utf-8"), keep_blank_values=True)
+        message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        return [
+            (part.get_param("name", header="content-disposition"), part.get_payload(decode=True).decode("utf-8"))
+            for part in message.iter_parts()
+        ]
+
+    def _logged_in(self):
+        for cookie in (self.headers.get("Cookie") or "").split(";"):
+            key, _, value = cookie.strip().partition("=")
+            if key == SESSION_COOKIE and value in self.mock.sessions:
+                return True
+        return False
+
+    def _send(self, status, body, headers=()):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in headers:
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location, headers=()):
+        self.send_response(302)
+        self.send_header("Location", ADMIN_PATH + location)
+        self.send_header("Content-Length", "0")
+        for key, value in headers:
+            self.send_header(key, value)
+        self.end_headers()
+
+    @staticmethod
+    def _page(title, content):
+        return (
+            f"<html><head><title>{title}</title></head><body>{content}"
+            f"<table width=\"100%\"><tr>{FOOTER}</tr></table></body></html>"
+        )
+
+    # Pages
+
+    def _logon(self, method):
+        if method == "POST":
+            username, password = self.form.get("adminuser", ""), self.form.get("adminPass", "")
+            if self.mock.check_credentials(username, password):
+                token = secrets.token_hex(16)
+                self.mock.sessions.add(token)
+                self._redirect("default.asp", [("Set-Cookie", f"{SESSION_COOKIE}={token}; Path=/")])
+                return
+        error = "<p class=\"error\">Identifiants incorrects</p>" if method == "POST" else ""
+        self._send(200, (
+            "<html><body>"
+            f"{error}<form name=\"logon\" method=\"post\" action=\"logon.asp\">"
+            "<input type=\"text\" id=\"adminuser\" name=\"adminuser\">"
+            "<input type=\"password\" id=\"adminPass\" name=\"adminPass\">"
+            "<button type=\"submit\" id=\"btn1\">Connexion</button>"
+            "</form></body></html>"
+        ))
+
+    def _default(self, method):
+        self._send(200, self._page("Administration", "<h1>Administration</h1><a href=\"SA_prod.asp\">Produits</a>"))
+
+    def _marque_value(self, number, name):
+        return str(number) if self.mock.marque_ids else name
+
+    def _search_form(self, marque="", phrase=""):
+        options = "".join(
+            f"<option value=\"{html.escape(value)}\"{' selected' if value == marque else ''}>{html.escape(name)}</option>"
+            for value, name in (
+                (self._marque_value(number, name), name) for number, name in enumerate(self.mock.catalog.marques, 1)
+            )
+        )
+        return (
+            "<form name=\"search\" method=\"get\" action=\"SA_prod.asp\">"
+            f"<select name=\"marque\"><option value=\"\">-- Toutes --</option>{options}</select>"
+            f"<input type=\"text\" name=\"showPhrase\" value=\"{html.escape(phrase)}\">"
+            "<button type=\"submit\" name=\"action\" value=\"search\">Rechercher</button>"
+            "</form>"
+        )
+
+    def _product_search(self, method):
+        marque, phrase = self.query.get("marque", ""), self.query.get("showPhrase", "")
+        content = self._search_form(marque, phrase)
+        if self.query.get("action") != "search":
+            self._send(200, self._page("Produits", content))
+            return
+
+        with self.mock.catalog.lock:
+            names = {self._marque_value(number, name): name for number, name in enumerate(self.mock.catalog.marques, 1)}
+            results = self.mock.catalog.search(names.get(marque, marque), phrase)
+        page_size = self.mock.page_size
+        page_total = max(1, -(-len(results) // page_size))
+        current = min(max(int(self.query.get("page", "1") or 1), 1), page_total)
+        rows = "".join(
+            "<tr>"
+            f"<td>{product['id']}</td><td>{html.escape(product['reference'])}</td>"
+            f"<td>{html.escape(product['name'])}</td><td>{html.escape(product['marque'])}</td>"
+            f"<td>{'Oui' if product['active'] else 'Non'}</td><td>10</td><td>-</td><td>{product['price']} €</td>"
+            f"<td><a href=\"SA_prodEdit.asp?idProduct={product['id']}\">Editer</a></td>"
+            "</tr>"
+            for product in results[(current - 1) * page_size:current * page_size]
+        )
+        content += (
+            "<table class=\"listTable\">"
+            "<tr><th>No</th><th>Référence</th><th>Désignation</th><th>Marque</th><th>Actif</th>"
+            "<th>Stock</th><th>Prix achat</th><th>Prix public</th><th></th></tr>"
+            f"{rows}</table>"
+        )
+
+        def page_link(number, text):
+            query = urlencode({"marque": marque, "showPhrase": phrase, "action": "search", "page": number})
+            return f"<a href=\"SA_prod.asp?{query}\">{text}</a>"
+
+        first = max(1, current - PAGE_LINK_WINDOW // 2)
+        links = [
+            page_link(number, number) if number != current else f"<b>{number}</b>"
+            for number in range(first, min(page_total, first + PAGE_LINK_WINDOW - 1) + 1)
+        ]
+        if current < page_total:
+            links.append(page_link(current + 1, "Suiv."))
+        content += f"<div class=\"pagination\">{' '.join(links)}</div>"
+        self._send(200, self._page("Produits", content))
+
+    def _product_edit(self, method):
+        product = self.mock.catalog.products.get(int(self.query.get("idProduct", "0") or 0))
+        if product is None:
+            self._send(404, self._page("Produit", "<p>Produit introuvable</p>"))
+            return
+        message = ""
+        if method == "POST":
+            rejected = [name for name in DISABLED_FIELDS if name in self.form]
+            if rejected:
+                self._send(400, self._page("Produit", f"<p>Champ en lecture seule : {', '.join(rejected)}</p>"))
+                return
+            # Like the real form, every posted field replaces the stored value
+            with self.mock.catalog.lock:
+                product["active"] = "active" in self.form
+                if self.form.get("price"):
+                    product["price"] = self.form["price"]
+                product["categories"] = [value for key, value in self.form_fields if key == "categories"]
+                product["description"] = self.form.get("description", "")
+            message = "<p class=\"message\">Produit mis à jour</p>"
+        checked = " checked" if product["active"] else ""
+        # Options without their </option>, as the admin writes them
+        categories = "".join(
+            f"<option value=\"{html.escape(name)}\"{' selected' if name in product['categories'] else ''}>"
+            f"{html.escape(name)}"
+            for name in CATEGORIES
+        )
+        content = (
+            f"{message}<form name=\"prodForm\" method=\"post\" enctype=\"multipart/form-data\" "
+            f"action=\"SA_prodEdit.asp?idProduct={product['id']}\">"
+            f"<input type=\"hidden\" name=\"idProduct\" value=\"{product['id']}\">"
+            f"<input type=\"text\" name=\"reference\" value=\"{html.escape(product['reference'])}\">"
+            f"<input type=\"text\" name=\"created\" value=\"01/01/2024\" disabled>"
+            f"<input type=\"text\" id=\"price\" name=\"price\" value=\"{product['price']}\">"
+            f"<select name=\"categories\" multiple size=\"6\">{categories}</select>"
+            f"<textarea name=\"description\">\n{html.escape(product['description'])}</textarea>"
+            "<input type=\"file\" name=\"image\">"
+            f"<input type=\"checkbox\" name=\"active\" value=\"1\"{checked}> Actif"
+            "<img src=\"uncheck.gif\" alt=\"Décocher tout\" "
+            "onclick=\"for (const box of document.prodForm.querySelectorAll('input[type=checkbox]')) "
+            "box.checked = false;\">"
+            "<button type=\"submit\">Mettre à jour</button>"
+            "</form>"
+        )
+        self._send(200, self._page("Produit", content))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the RestauConcept admin back office.")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--marques", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every page.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, up to this many seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = MockAdminServer(
+        args.products, args.marques, args.page_size, args.latency, args.jitter, args.error_rate, port=args.port
+    )
+    print(f"Mock admin listening on {server.base_url}  (RESTAUCONCEPT_ADMIN_URL={server.base_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+End-to-end throughput benchmarks of the automations, against the local mock admin.
+
+Each mode runs in its own process with a fresh mock server and data
+directory, so memory peaks and session caches do not leak between modes:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --modes scrape-http,deactivate-4 --latency 0.05 --output after.json
+    python -m benchmarks.run --baseline before.json
+
+Modes:
+    scrape-http                Marque listing over plain HTTP (pages/s).
+    scrape-browser-lean/full   Marque listing in Chromium, lean or full profile (pages/s).
+    scrape-<engine>-all        Every marque of the search form, scraped concurrently (pages/s).
+    deactivate-<N>             Deactivation of --references references on N browser contexts (references/s).
+    push-<N>                   Price update of --references references with N HTTP workers, read-back
+                               included (references/s).
+    <mode>-indexed             deactivate/push with the product ids indexed beforehand, so that edit pages
+                               are opened directly instead of through a search.
+
+Step latency is the time between result pages when scraping, and the time
+spent on each reference (retries included) when deactivating. Peak memory is
+the maximum RSS of the benchmark process; the Chromium processes are not included.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.mock_admin import DEFAULT_PAGE_SIZE, MockAdminServer
+from utils.timing import TOTAL_STEP, percentile
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODES = [
+    "scrape-http", "scrape-http-all", "scrape-browser-lean", "scrape-browser-full", "scrape-browser-lean-all",
+    "deactivate-1", "deactivate-4", "deactivate-4-indexed", "push-1", "push-8", "push-8-indexed",
+]
+BENCHMARK_MARQUE = "Marque 1"
+
+
+def _load_page(name):
+    """Imports a Streamlit page module (pages/ is not a package)."""
+    spec = importlib.util.spec_from_file_location(f"pages_{name}", REPO_ROOT / "pages" / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def _scrape(http, lean=True, all_marques=False):
+    data_scraper = _load_page("data_scraper")
+    engine = data_scraper.ENGINE_HTTP if http else data_scraper.ENGINE_BROWSER
+    marques = data_scraper.ALL_MARQUES if all_marques else BENCHMARK_MARQUE
+    scraper = data_scraper.RestauConceptScraper("bench", "bench", marques, engine=engine, lean=lean)
+    marks = [time.perf_counter()]
+    records = await scraper.scrape_marques(on_page=lambda row_count: marks.append(time.perf_counter()))
+    steps = [end - start for start, end in zip(marks, marks[1:])]
+    return {"units": len(steps), "unit": "pages", "items": len(records or []), "failed": int(records is None),
+            "steps": steps}
+
+
+def _product_index(products):
+    """Returns a ProductIndex of the mock products, as a scrape of their listing would build it."""
+    from utils.product_index import ProductIndex
+
+    index = ProductIndex()
+    index.update_marque("bench", [{"Référence": product["reference"], "No": product["id"]} for product in products])
+    return index
+
+
+async def _deactivate(references, concurrency, product_index=None):
+    desactivate_products = _load_page("desactivate_products")
+    deactivator = desactivate_products.ProductDeactivator("bench", "bench", product_index=product_index)
+    results = await deactivator.run_automation(references, concurrency=concurrency, skip_done=False)
+    steps = [span["duration"] for span in deactivator.timer.spans if span["step"] == TOTAL_STEP]
+    failed = len(references) if results is None else sum(
+        1 for status in results.values() if status != desactivate_products.STATUS_OK
+    )
+    return {"units": len(references), "unit": "references", "items": len(references), "failed": failed,
+            "steps": steps}
+
+
+def _push(products, concurrency, product_index=None):
+    from utils.price_push import STATUS_UPDATED, PricePusher, parse_price
+
+    changes = [
+        (product["reference"], parse_price(product["price"]), parse_price(product["price"]) + 1)
+        for product in products
+    ]
+    pusher = PricePusher("bench", "bench", concurrency=concurrency, product_index=product_index)
+    try:
+        results = pusher.run(changes, dry_run=False)
+    finally:
+        pusher.close()
+    steps = [span["duration"] for span in pusher.timer.spans if span["step"] == TOTAL_STEP]
+    failed = len(changes) if results is None else sum(
+        1 for result in results.values() if result["status"] != STATUS_UPDATED
+    )
+    return {"units": len(changes), "unit": "references", "items": len(changes), "failed": failed, "steps": steps}
+
+
+def run_mode(mode, args):
+    """Runs one mode in this process and returns its metrics."""
+    server = MockAdminServer(
+        args.products, args.marques, args.page_size, args.latency, args.jitter, args.error_rate
+    ).start()
+    # Must be set before the pages (and utils.admin_urls) are imported
+    os.environ["RESTAUCONCEPT_ADMIN_URL"] = server.base_url
+    indexed = mode.endswith("-indexed")
+    mode_name, mode = mode, mode[:-len("-indexed")] if indexed else mode
+    products = list(server.catalog.products.values())[:args.references]
+    try:
+        started = time.perf_counter()
+        if mode.startswith("scrape-"):
+            all_marques = mode.endswith("-all")
+            engine = mode[len("scrape-"):-len("-all")] if all_marques else mode[len("scrape-"):]
+            if engine not in ("http", "browser-lean", "browser-full"):
+                raise ValueError(f"Unknown mode {mode!r}")
+            result = asyncio.run(_scrape(engine == "http", engine == "browser-lean", all_marques))
+        elif mode.startswith("deactivate-"):
+            references = [product["reference"] for product in products]
+            product_index = _product_index(products) if indexed else None
+            result = asyncio.run(_deactivate(references, int(mode.rsplit("-", 1)[1]), product_index))
+        elif mode.startswith("push-"):
+            product_index = _product_index(products) if indexed else None
+            result = _push(products, int(mode.rsplit("-", 1)[1]), product_index)
+        else:
+            raise ValueError(f"Unknown mode {mode!r}")
+        elapsed = time.perf_counter() - started
+    finally:
+        server.stop()
+
+    steps = result.pop("steps")
+    return {
+        "mode": mode_name,
+        **result,
+        "elapsed": elapsed,
+        "per_second": result["units"] / elapsed if elapsed else None,
+        "p50_ms": percentile(steps, 50) * 1000 if steps else None,
+        "p95_ms": percentile(steps, 95) * 1000 if steps else None,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "server_requests": sum(server.requests.values()),
+        "server_errors": server.errors,
+    }
+
+
+def _run_isolated(mode, argv):
+    """Runs a mode in a child process and returns its metrics, or an error entry."""
+    # Set in the environment, as utils.paths is imported before run_mode starts
+    env = {**os.environ, "RESTAUCONCEPT_DATA_DIR": tempfile.mkdtemp(prefix="restauconcept-bench-")}
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--child", mode, *argv],
+        cwd=REPO_ROOT, capture_output=True, text=True, env=env,
+    )
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        errors = [line for line in lines if re.match(r"^[\w.]*(Error|Exception)\b", line)]
+        error = (errors or lines or [f"exit code {completed.returncode}"])[-1]
+        return {"mode": mode, "error": error[:160]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _format(value, digits=1):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def print_report(results, baseline=None):
+    baseline = {entry["mode"]: entry for entry in baseline or [] if "error" not in entry}
+    header = f"{'mode':<22}{'units':>8}{'unit/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'peak MB':>10}{'failed':>8}"
+    if baseline:
+        header += f"{'vs base':>10}"
+    print(header)
+    for entry in results:
+        if "error" in entry:
+            print(f"{entry['mode']:<22}skipped: {entry['error']}")
+            continue
+        line = (
+            f"{entry['mode']:<22}{entry['units']:>8}{_format(entry['per_second'], 2):>10}"
+            f"{_format(entry['p50_ms']):>10}{_format(entry['p95_ms']):>10}"
+            f"{_format(entry['peak_rss_mb']):>10}{entry['failed']:>8}"
+        )
+        before = baseline.get(entry["mode"])
+        if before and before.get("per_second"):
+            line += f"{(entry['per_second'] / before['per_second'] - 1) * 100:>+9.0f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput benchmarks against the local mock admin.")
+    parser.add_argument("--modes", default=",".join(DEFAULT_MODES), help="Comma-separated modes to run.")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--marques", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--references", type=int, default=40, help="References deactivated per run.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every mock page.")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare throughput with.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, args)))
+        return
+
+    argv = [
+        f"--{key.replace('_', '-')}={value}" for key, value in vars(args).items()
+        if key in ("products", "marques", "page_size", "references", "latency", "jitter", "error_rate")
+    ]
+    results = [_run_isolated(mode, argv) for mode in args.modes.split(",") if mode]
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
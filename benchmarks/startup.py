@@ -0,0 +1,127 @@
+"""
+Cold and warm load times of every Streamlit page.
+
+Each page is loaded in its own fresh process with Streamlit's AppTest: the
+first run is the cold load (the page's imports included), the next runs are
+warm reruns, as when a widget is clicked:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --pages Home.py,pages/data_scraper.py --runs 20 --output after.json
+    python -m benchmarks.startup --baseline before.json
+
+The heavy modules column lists the optional heavy dependencies a page
+imported on its cold load; a page should only import them on the code path
+that uses them.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from utils.timing import percentile
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PAGES = ["Home.py", *sorted(f"pages/{path.name}" for path in (REPO_ROOT / "pages").glob("*.py"))]
+HEAVY_MODULES = [
+    "pandas", "pyarrow", "playwright", "requests", "altair", "plyer", "pdfplumber", "pypdfium2", "openpyxl",
+]
+
+
+def load_page(page, runs):
+    """Loads a page in this process and returns its metrics."""
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    streamlit_import = time.perf_counter() - started
+    app = AppTest.from_file(str(REPO_ROOT / page), default_timeout=120)
+    started = time.perf_counter()
+    app.run()
+    cold = time.perf_counter() - started
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    warm = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        app.run()
+        warm.append(time.perf_counter() - started)
+    return {
+        "page": page,
+        "streamlit_import_ms": streamlit_import * 1000,
+        "cold_ms": cold * 1000,
+        "warm_p50_ms": percentile(warm, 50) * 1000 if warm else None,
+        "warm_p95_ms": percentile(warm, 95) * 1000 if warm else None,
+        "heavy_modules": heavy,
+    }
+
+
+def _run_isolated(page, runs):
+    """Loads a page in a child process and returns its metrics, or an error entry."""
+    env = {**os.environ, "RESTAUCONCEPT_DATA_DIR": tempfile.mkdtemp(prefix="restauconcept-startup-")}
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", page, f"--runs={runs}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, env=env,
+    )
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines() or [f"exit code {completed.returncode}"]
+        return {"page": page, "error": lines[-1][:160]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _format(value, digits=1):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def print_report(results, baseline=None):
+    baseline = {entry["page"]: entry for entry in baseline or [] if "error" not in entry}
+    header = f"{'page':<36}{'cold ms':>10}{'warm p50':>10}{'warm p95':>10}"
+    if baseline:
+        header += f"{'cold vs base':>14}"
+    print(header + "  heavy modules")
+    for entry in results:
+        if "error" in entry:
+            print(f"{entry['page']:<36}failed: {entry['error']}")
+            continue
+        line = (
+            f"{entry['page']:<36}{_format(entry['cold_ms']):>10}"
+            f"{_format(entry['warm_p50_ms']):>10}{_format(entry['warm_p95_ms']):>10}"
+        )
+        before = baseline.get(entry["page"])
+        if before:
+            line += f"{(entry['cold_ms'] / before['cold_ms'] - 1) * 100:>+13.0f}%"
+        elif baseline:
+            line += f"{'-':>14}"
+        print(f"{line}  {', '.join(entry['heavy_modules']) or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold and warm load times of the Streamlit pages.")
+    parser.add_argument("--pages", default=",".join(DEFAULT_PAGES), help="Comma-separated page scripts.")
+    parser.add_argument("--runs", type=int, default=10, help="Warm reruns per page.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare cold loads with.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(load_page(args.child, args.runs)))
+        return
+
+    results = [_run_isolated(page, args.runs) for page in args.pages.split(",") if page]
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,21 @@
 
 import logging
 import streamlit as st
-from playwright.async_api import async_playwright
 import asyncio
 import platform
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.admin_urls import ADMIN_DEFAULT_URL, LOGIN_PAGE_URL, PRODUCT_SEARCH_URL
+from utils.browser_pool import open_browser_session
+from utils.exports import download_buttons
+from utils.http_scraper import DEFAULT_WORKERS as HTTP_WORKERS, HttpListingScraper
+from utils.job_view import JOB_QUERY_PARAM, current_job, follow_job
+from utils.jobs import JOB_DONE, get_job_runner
+from utils.product_index import get_product_index
+from utils.session_cache import SessionCache, clone_admin_contexts, open_admin_context, process_queue
+from utils.snapshot_store import SnapshotStore
+from utils.startup import page_load_timer
+from utils.table_extract import LISTING_COLUMNS, extract_table
+from utils.timing import TOTAL_STEP, StepTimer
 
 if platform.system() == "Windows":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
@@ -18,105 +29,213 @@ logger = logging.getLogger(__name__)
 
 
 # Constants for readability and maintainability
-LOGIN_PAGE_URL = "https://www.restoconcept.com/admin/logon.asp"
-ADMIN_DEFAULT_URL = "https://www.restoconcept.com/admin/default.asp"
 FOOTER_SELECTOR = (
     'td[align="center"][style="background-color:#eeeeee"]:has-text("© Copyright 2025 - Restoconcept")'
 )
 
+# Scrapes every marque listed in the search form
+ALL_MARQUES = "all"
+MARQUE_COLUMN = "Marque"
+MARQUE_OPTION_SELECTOR = 'select[name="marque"] option'
+DEFAULT_MARQUE_CONCURRENCY = 3
+MAX_MARQUE_CONCURRENCY = 8
+
+# Scraping engines
+ENGINE_BROWSER = "browser"
+ENGINE_HTTP = "http"
+ENGINE_LABELS = {ENGINE_BROWSER: "Browser (Chromium)", ENGINE_HTTP: "HTTP (no browser, faster)"}
+
 class RestauConceptScraper:
     """Handles the scraping logic for RestauConcept."""
-    def __init__(self, username: str, password: str, marque: str):
+    def __init__(
+        self, username: str, password: str, marques, session_cache=None, engine: str = ENGINE_BROWSER,
+        columns: dict = None, lean: bool = True, browser_pool=None, concurrency: int = DEFAULT_MARQUE_CONCURRENCY,
+    ):
         self.username = username
         self.password = password
-        self.marque = marque
+        # A marque, a list of marques, or ALL_MARQUES
+        self.marques = [marques] if isinstance(marques, str) else list(marques)
+        self.concurrency = concurrency
+        self.failed_marques = {}
+        self.session_cache = session_cache or SessionCache()
+        self.engine = engine
+        self.columns = columns or LISTING_COLUMNS
+        self.lean = lean
+        self.browser_pool = browser_pool
+        self.last_run_stats = None
+        # Step timings of the last scrape
+        self.timer = StepTimer()
 
     async def login(self, page) -> bool:
         """Logs into the Restoconcept admin portal."""
         try:
-            logger.info("Navigating to login page...")
-            await page.goto("https://www.restoconcept.com/admin/logon.asp")
-            await page.fill("#adminuser", self.username)
-            await page.fill("#adminPass", self.password)
-            await page.click("#btn1")
-
-            # Check for successful login
-            try:
-                page.wait_for_selector(FOOTER_SELECTOR, timeout=5000)
-                return True
-            except Exception:
-                if page.url == ADMIN_DEFAULT_URL:
-                    logger.info("Login successful: Redirect to admin default page detected.")
+            with self.timer.span("login"):
+                logger.info("Navigating to login page...")
+                await page.goto(LOGIN_PAGE_URL)
+                await page.fill("#adminuser", self.username)
+                await page.fill("#adminPass", self.password)
+                await page.click("#btn1")
+
+                # Check for successful login
+                try:
+                    await page.wait_for_selector(FOOTER_SELECTOR, timeout=5000)
                     return True
-                else:
-                    logger.error("Login failed: Neither footer nor admin default page detected.")
-                    return False
+                except Exception:
+                    if page.url == ADMIN_DEFAULT_URL:
+                        logger.info("Login successful: Redirect to admin default page detected.")
+                        return True
+                    else:
+                        logger.error("Login failed: Neither footer nor admin default page detected.")
+                        return False
         except Exception as e:
             logger.error(f"Error during login: {e}")
             return False
 
-    async  def scrape_marque(self):  
-        """Searches for a product by reference and unchecks the active checkbox."""
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+    async def scrape_marques(self, on_page=None, on_marque=None):
+        """
+        Scrapes Référence / No / Prix public of every product of the marques with the selected engine.
+
+        With ALL_MARQUES, the marques are read from the options of the search form. Marques are scraped
+        concurrently with a single login; a marque that fails is recorded in `self.failed_marques` and the
+        others are still returned. `on_page(row_count)` is called after each result page and
+        `on_marque(marque, records)` in a worker thread as each marque completes. Steps are timed into
+        `self.timer`.
+
+        Returns:
+            list: The records of every scraped marque with a MARQUE_COLUMN, or None if login failed.
+        """
+        self.timer = StepTimer()
+        self.failed_marques = {}
+        if self.engine == ENGINE_HTTP:
+            return await asyncio.to_thread(self._scrape_marques_http, on_page, on_marque)
+        return await self._scrape_marques_browser(on_page, on_marque)
+
+    @staticmethod
+    def _merge(marques, results):
+        """Concatenates the per-marque records in marque order, tagging each with its marque."""
+        return [
+            {MARQUE_COLUMN: marque, **record}
+            for marque in marques if marque in results
+            for record in results[marque]
+        ]
+
+    def _marque_done(self, marque, records, results, on_marque=None):
+        results[marque] = records
+        if on_marque is not None:
+            on_marque(marque, records)
+
+    def _marque_failed(self, marque, error):
+        logger.error(f"Error during scraping of {marque}: {error}")
+        self.failed_marques[marque] = str(error)
 
-            if await self.login(page):
+    def _scrape_marques_http(self, on_page=None, on_marque=None):
+        """Scrapes the listings over HTTP, the marques and their result pages concurrently."""
+        scraper = HttpListingScraper(
+            self.username, self.password, self.session_cache, columns=self.columns,
+            pool_size=HTTP_WORKERS * self.concurrency,
+        )
+        try:
+            with self.timer.span("login"):
+                if not scraper.login():
+                    return None
+            marques = scraper.list_marques() if self.marques == [ALL_MARQUES] else self.marques
+
+            def scrape(marque):
+                with self.timer.span(TOTAL_STEP, marque):
+                    return scraper.scrape_marque(marque, on_page)
+
+            results = {}
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = {executor.submit(scrape, marque): marque for marque in marques}
+                for future in as_completed(futures):
+                    marque = futures[future]
+                    try:
+                        self._marque_done(marque, future.result(), results, on_marque)
+                    except Exception as e:
+                        self._marque_failed(marque, e)
+            return self._merge(marques, results)
+        except Exception as e:
+            logger.error(f"Error during scraping: {e}")
+            return None
+        finally:
+            scraper.close()
+
+    async def _scrape_marques_browser(self, on_page=None, on_marque=None):
+        """Pages through the listings in headless Chromium, one context per concurrent marque."""
+        marques = None if self.marques == [ALL_MARQUES] else self.marques
+        workers = self.concurrency if marques is None else max(1, min(self.concurrency, len(marques)))
+        browser = open_browser_session("scraping", self.browser_pool, lean=self.lean, contexts=workers)
+        async with browser as browser_session:
+            self.last_run_stats = browser_session.stats
+            wait_until = browser_session.wait_until
+            context = await open_admin_context(browser_session, self.username, self.login, self.session_cache)
+            if context is None:
+                return None
+
+            if marques is None:
                 try:
-                    await page.goto("https://www.restoconcept.com/admin/SA_prod.asp", wait_until="networkidle")
-                    await page.select_option('select[name="marque"]', self.marque)
-                    await page.click('button:has-text("Rechercher")')
-                    await page.wait_for_load_state("networkidle")
-                    edit_links = []
-                    while True:
-                        rows = await page.query_selector_all('table.listTable tr')
-                        for row in rows:
-                            tds = await row.query_selector_all("td")
-                            if len(tds) >= 5:
-                                first_td = await tds[0].inner_text()
-                                second_td = await tds[1].inner_text()
-                                eighth_td = await tds[7].inner_text()
-                                edit_links.append({
-                                    "Référence": second_td,
-                                    "No": first_td,
-                                    "Prix public": eighth_td,
-                                })
-                        next_links = await page.locator('a:has-text("Suiv.")').all()
-                        if not next_links:
-                            break
-                        await next_links[0].click()
-                        await page.wait_for_load_state("networkidle")
-                    await browser.close()
-                    return edit_links
+                    marques = await self._list_marques_browser(context, wait_until)
                 except Exception as e:
-                    logger.error(f"Error during scraping: {e}")
-                    await browser.close()
+                    logger.error(f"Error while listing the marques: {e}")
                     return None
-            else:
-                await browser.close()
-                return None
 
-    async def run_automation(self, references, headless=True):
-        """Runs the automation process for multiple references."""
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=headless)
-            page = await browser.new_page()
+            contexts = await clone_admin_contexts(browser_session, context, min(workers, len(marques)))
+            results = {}
 
-            # Perform login
-            if not await self.login(page):
-                logger.error("Login failed. Aborting automation.")
-                await browser.close()
-                return False
+            async def scrape(worker_context, page, marque):
+                try:
+                    with self.timer.span(TOTAL_STEP, marque):
+                        records = await self._scrape_listing(page, marque, browser_session, on_page)
+                    # on_marque may write to disk: run it off the event loop shared by the pooled browsers
+                    await asyncio.to_thread(self._marque_done, marque, records, results, on_marque)
+                except Exception as e:
+                    self._marque_failed(marque, e)
 
-            # Process references
-            for reference in references:
-                logger.info(f"Processing reference: {reference}")
-                success = await self.perform_search_and_uncheck(page, reference)
-                if not success:
-                    logger.error(f"Failed to process reference: {reference}")
+            await process_queue(contexts, marques, scrape)
+            return self._merge(marques, results)
 
-            await browser.close()
-            return True
+    async def _list_marques_browser(self, context, wait_until):
+        """Returns the labels of the marque options of the search form."""
+        page = await context.new_page()
+        try:
+            await page.goto(PRODUCT_SEARCH_URL, wait_until=wait_until)
+            options = await page.eval_on_selector_all(
+                MARQUE_OPTION_SELECTOR,
+                "options => options.map(option => [option.value, option.textContent.trim()])",
+            )
+        finally:
+            await page.close()
+        return [label for value, label in options if value.strip()]
+
+    async def _scrape_listing(self, page, marque, browser_session, on_page=None):
+        """Searches one marque and pages through its listing."""
+        span = self.timer.span
+        wait_until = browser_session.wait_until
+        with span("open_search", marque):
+            await page.goto(PRODUCT_SEARCH_URL, wait_until=wait_until)
+            await page.wait_for_selector('select[name="marque"]')
+        with span("search", marque):
+            await page.select_option('select[name="marque"]', marque)
+            async with page.expect_navigation(wait_until=wait_until):
+                await page.click('button:has-text("Rechercher")')
+        edit_links = []
+        page_number = 1
+        while True:
+            item = f"{marque} #{page_number}"
+            with span("extract_page", item):
+                records = await extract_table(page, columns=self.columns)
+            edit_links.extend(records)
+            browser_session.stats.units += 1
+            if on_page is not None:
+                on_page(len(records))
+            next_links = await page.locator('a:has-text("Suiv.")').all()
+            if not next_links:
+                break
+            with span("next_page", item):
+                async with page.expect_navigation(wait_until=wait_until):
+                    await next_links[0].click()
+            page_number += 1
+        return edit_links
 
 
 class ScraperApp:
@@ -125,7 +244,10 @@ class ScraperApp:
     def __init__(self):
         self.username = None
         self.password = None
-        self.marque = None
+        self.marques = []
+        self.engine = ENGINE_BROWSER
+        self.lean = True
+        self.concurrency = DEFAULT_MARQUE_CONCURRENCY
         self.scraper = None
 
     def run(self):
@@ -134,44 +256,103 @@ class ScraperApp:
         st.sidebar.header("User Login")
         self.username = st.sidebar.text_input("Username")
         self.password = st.sidebar.text_input("Password", type="password")
-        self.marque = st.sidebar.text_input("Supplier/Brand (Marque)").strip()
+        if st.sidebar.checkbox("All brands"):
+            self.marques = [ALL_MARQUES]
+        else:
+            marques_text = st.sidebar.text_input("Supplier/Brand (Marque), several separated by commas")
+            self.marques = list(dict.fromkeys(marque.strip() for marque in marques_text.split(",") if marque.strip()))
+        self.concurrency = st.sidebar.slider(
+            "Brands scraped in parallel", min_value=1, max_value=MAX_MARQUE_CONCURRENCY,
+            value=DEFAULT_MARQUE_CONCURRENCY,
+        )
+        self.engine = st.sidebar.radio(
+            "Scraping engine", list(ENGINE_LABELS), format_func=ENGINE_LABELS.get
+        )
+        self.lean = st.sidebar.checkbox(
+            "Lean browser (skip images, fonts and third-party requests)", value=True,
+            disabled=self.engine != ENGINE_BROWSER,
+        )
         if st.sidebar.button("Start Scraping"):
             self.start_scraping()
         st.sidebar.markdown("""
         ---
         **Instructions:**
         1. Enter your username and password.
-        2. Input the supplier/brand (marque).
+        2. Input the supplier/brand (marque), several separated by commas, or tick "All brands".
         3. Click "Start Scraping" to fetch the data.
         """)
+
+        job = current_job("scraping")
+        if job is not None:
+            self.show_job(job)
+
     def start_scraping(self):
-        """Start the scraping process."""
-        if not self.username or not self.password or not self.marque:
+        """Submits the scraping as a background job and selects it in the URL."""
+        if not self.username or not self.password or not self.marques:
             st.error("Please fill out all fields.")
             return
-        with st.spinner("Scraping data, please wait..."):
-
-            try:
-                # Initialize scraper and start scraping
-                self.scraper = RestauConceptScraper(self.username, self.password, self.marque)
-                links = asyncio.run(self.scraper.scrape_marque())
-                if links:
-                    st.success(f"Found {len(links)} products for marque {self.marque}.")
-                    df = pd.DataFrame(links)
-                    st.write(df)
-                    # Export to Excel
-                    output_file = f"{self.marque}_products.xlsx"
-                    df.to_excel(output_file, index=False)
-                    with open(output_file, "rb") as file:
-                        st.download_button("Download Excel File", file, file_name=output_file)
-                else:
-                    st.warning("No products found or login failed.")
-
-            except Exception as e:
-                st.error(f"An error occurred: {e}")
+
+        # Initialize scraper and start scraping
+        self.scraper = RestauConceptScraper(
+            self.username, self.password, self.marques, engine=self.engine, lean=self.lean,
+            browser_pool=get_job_runner().browser_pool, concurrency=self.concurrency,
+        )
+        scraper = self.scraper
+        snapshots = {}
+
+        def save_snapshot(marque, records):
+            # Saved as each brand completes, so finished brands survive a later failure
+            if records:
+                snapshots[marque] = SnapshotStore().save(marque, records)
+
+        async def run_job(job):
+            links = await scraper.scrape_marques(
+                on_page=lambda row_count: job.advance(), on_marque=save_snapshot
+            )
+            if scraper.last_run_stats:
+                job.summary = scraper.last_run_stats.summary()
+            job.timings = scraper.timer
+            if links is None:
+                return None
+            if snapshots:
+                # Lets deactivations and price updates open these products' edit pages directly
+                await asyncio.to_thread(get_product_index().refresh, SnapshotStore())
+            return {"links": links, "snapshots": snapshots, "failed": scraper.failed_marques}
+
+        label = "all brands" if self.marques == [ALL_MARQUES] else ", ".join(self.marques)
+        job = get_job_runner().submit("scraping", f"Scraping of {label}", run_job, unit="pages")
+        st.query_params[JOB_QUERY_PARAM] = job.id
+
+    def show_job(self, job):
+        """Follows a scraping job and shows the products once it has finished."""
+        job = follow_job(job)
+        if job is None or job.status != JOB_DONE:
+            return
+        if not job.result:
+            st.warning("Login failed or the brands could not be listed.")
+            return
+        for marque, error in job.result["failed"].items():
+            st.error(f"Scraping of {marque} failed: {error}")
+        if not job.result["links"]:
+            st.warning("No products found.")
+            return
+
+        import pandas as pd
+
+        links, snapshots = job.result["links"], job.result["snapshots"]
+        df = pd.DataFrame(links)
+        marques = df[MARQUE_COLUMN].unique().tolist()
+        st.success(f"Found {len(links)} products for {len(marques)} marques ({', '.join(marques)}).")
+        if snapshots:
+            st.caption(f"Saved as snapshots of {', '.join(sorted(snapshots))}; compare them on the Price Update page.")
+        st.write(df)
+        # Serialized in memory once per job, not written to the working directory
+        base_name = f"{marques[0]}_products" if len(marques) == 1 else "products"
+        download_buttons(df, base_name, cache_key=("scraping", job.id), sheet_name="Products")
 
 
 # Run the Streamlit app
 if __name__ == "__main__":
-    app = ScraperApp()
-    app.run()
+    with page_load_timer("Data Scraper"):
+        app = ScraperApp()
+        app.run()
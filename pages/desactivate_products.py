@@ -3,9 +3,21 @@
 
 import logging
 import streamlit as st
-from playwright.async_api import async_playwright
 import asyncio
 import platform
+import re
+import uuid
+from utils.admin_urls import ADMIN_DEFAULT_URL, LOGIN_PAGE_URL, PRODUCT_SEARCH_URL, product_edit_url
+from utils.browser_pool import open_browser_session
+from utils.job_view import JOB_QUERY_PARAM, current_job, follow_job
+from utils.jobs import JOB_DONE, get_job_runner
+from utils.journal import get_journal
+from utils.product_index import get_product_index
+from utils.session_cache import SessionCache, clone_admin_contexts, open_admin_context, process_queue
+from utils.snapshot_store import SnapshotStore
+from utils.startup import page_load_timer
+from utils.table_extract import LISTING_COLUMNS
+from utils.timing import TOTAL_STEP, StepTimer, TraceRecorder
 
 if platform.system() == "Windows":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
@@ -15,89 +27,284 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Constants for readability and maintainability
-LOGIN_PAGE_URL = "https://www.restoconcept.com/admin/logon.asp"
-ADMIN_DEFAULT_URL = "https://www.restoconcept.com/admin/default.asp"
 FOOTER_SELECTOR = (
     'td[align="center"][style="background-color:#eeeeee"]:has-text("© Copyright 2025 - Restoconcept")'
 )
+EDIT_LINK_SELECTOR = 'td a:has-text("Editer")'
+RESULT_ROW_SELECTOR = "table.listTable tr"
+SEARCH_INPUT_SELECTOR = 'input[name="showPhrase"]'
+PRODUCT_FORM_SELECTOR = 'form[name="prodForm"]'
+REFERENCE_INPUT_SELECTOR = f'{PRODUCT_FORM_SELECTOR} [name="reference"]'
+
+# Per-reference outcomes returned by run_automation
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_NOT_FOUND = "not_found"
+STATUS_AMBIGUOUS = "ambiguous"
+STATUS_SKIPPED = "skipped"
+
+# Journal action name, and the outcomes that make a reference "done"
+JOURNAL_ACTION = "deactivate"
+DONE_STATUSES = (STATUS_OK, STATUS_NOT_FOUND)
+# Only outcomes this recent are skipped: a product may be reactivated, or a reference created, later on
+DEFAULT_SKIP_WINDOW_HOURS = 24
+
+# Retries of failed references, with exponential backoff
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 2.0
+
+DEFAULT_CONCURRENCY = 4
+MAX_CONCURRENCY = 8
+
+# Playwright traces kept when tracing is enabled
+DEFAULT_TRACED_REFERENCES = 5
 
 class ProductDeactivator:
     """Handles the logic and automation tasks for deactivating products."""
 
-    def __init__(self, username, password):
+    def __init__(
+        self, username, password, session_cache=None, lean=True, browser_pool=None, journal=None, trace_slowest=0,
+        product_index=None,
+    ):
         self.username = username
         self.password = password
+        self.session_cache = session_cache or SessionCache()
+        self.journal = journal
+        # Known admin product ids open the edit page directly; other references are searched
+        self.product_index = product_index
+        self.product_ids = {}
+        self.lean = lean
+        self.browser_pool = browser_pool
+        self.wait_until = "domcontentloaded" if lean else "networkidle"
+        self.last_run_stats = None
+        # Step timings of the last run, and the traces of its slowest references when trace_slowest > 0
+        self.trace_slowest = trace_slowest
+        self.timer = StepTimer()
+        self.traces = {}
 
     async def login(self, page) -> bool:
         """Logs into the Restoconcept admin portal."""
         try:
-            logger.info("Navigating to login page...")
-            await page.goto("https://www.restoconcept.com/admin/logon.asp")
-            await page.fill("#adminuser", self.username)
-            await page.fill("#adminPass", self.password)
-            await page.click("#btn1")
-
-            # Check for successful login
-            try:
-                page.wait_for_selector(FOOTER_SELECTOR, timeout=5000)
-                return True
-            except Exception:
-                if page.url == ADMIN_DEFAULT_URL:
-                    logger.info("Login successful: Redirect to admin default page detected.")
+            with self.timer.span("login"):
+                logger.info("Navigating to login page...")
+                await page.goto(LOGIN_PAGE_URL)
+                await page.fill("#adminuser", self.username)
+                await page.fill("#adminPass", self.password)
+                await page.click("#btn1")
+
+                # Check for successful login
+                try:
+                    await page.wait_for_selector(FOOTER_SELECTOR, timeout=5000)
                     return True
-                else:
-                    logger.error("Login failed: Neither footer nor admin default page detected.")
-                    return False
+                except Exception:
+                    if page.url == ADMIN_DEFAULT_URL:
+                        logger.info("Login successful: Redirect to admin default page detected.")
+                        return True
+                    else:
+                        logger.error("Login failed: Neither footer nor admin default page detected.")
+                        return False
         except Exception as e:
             logger.error(f"Error during login: {e}")
             return False
 
-    async def perform_search_and_uncheck(self, page, reference) -> bool:
-        """Searches for a product by reference and unchecks the active checkbox."""
-        try:
-            logger.info(f"Navigating to search page for reference: {reference}...")
-            await page.goto("https://www.restoconcept.com/admin/SA_prod.asp")
-            await page.fill('input[name="showPhrase"]', reference)
-            await page.click('button:has-text("Rechercher")')
+    async def _open_by_id(self, page, reference, product_id) -> bool:
+        """
+        Opens the edit page of an indexed product id.
 
+        Drops the id and returns False when the page shows no form, or the form
+        of another reference (the product's reference was edited since the scrape).
+        """
+        with self.timer.span("open_edit", reference):
+            response = await page.goto(product_edit_url(product_id), wait_until=self.wait_until)
+            shown = None
+            if (response is None or response.ok) and await page.locator(REFERENCE_INPUT_SELECTOR).count():
+                shown = (await page.locator(REFERENCE_INPUT_SELECTOR).first.input_value()).strip()
+                if shown == reference:
+                    return True
+        if shown is None:
+            logger.warning(f"Product {product_id} no longer opens for {reference}; searching it instead.")
+        else:
+            logger.warning(
+                f"Product {product_id} now has the reference {shown!r}, not {reference}; searching it instead."
+            )
+        self.product_ids.pop(reference, None)
+        if self.product_index is not None:
+            self.product_index.forget(reference, product_id)
+        return False
 
-            await page.click('tr td a:has-text("Editer")')
+    async def _open_by_search(self, page, reference) -> str:
+        """
+        Searches a reference and opens the edit page of the result row with exactly that reference.
 
-            checkbox_selector = 'img[alt="Décocher tout"]'
-            await page.wait_for_selector(checkbox_selector, timeout=5000)
+        Returns:
+            str: None once the edit page is open, otherwise STATUS_NOT_FOUND or STATUS_AMBIGUOUS.
+        """
+        span = self.timer.span
+        logger.info(f"Navigating to search page for reference: {reference}...")
+        with span("open_search", reference):
+            await page.goto(PRODUCT_SEARCH_URL, wait_until=self.wait_until)
+        with span("search", reference):
+            await page.fill(SEARCH_INPUT_SELECTOR, reference)
+            async with page.expect_navigation(wait_until=self.wait_until):
+                await page.click('button:has-text("Rechercher")')
 
-            logger.info("Unchecking the checkbox...")
-            await page.click(checkbox_selector)
+        # The search matches substrings: keep the rows whose reference cell is the reference itself
+        reference_cell = page.locator(
+            f"td:nth-child({LISTING_COLUMNS['Référence'] + 1})",
+            has_text=re.compile(rf"^\s*{re.escape(reference)}\s*$"),
+        )
+        rows = page.locator(RESULT_ROW_SELECTOR).filter(has=reference_cell).filter(
+            has=page.locator(EDIT_LINK_SELECTOR)
+        )
+        row_count = await rows.count()
+        if row_count == 0:
+            logger.warning(f"No product found for reference: {reference}")
+            return STATUS_NOT_FOUND
+        if row_count > 1:
+            logger.warning(f"{row_count} products have the reference {reference}; none was changed.")
+            return STATUS_AMBIGUOUS
+
+        product_id = (await rows.locator("td").nth(LISTING_COLUMNS["No"]).inner_text()).strip()
+        if self.product_index is not None and product_id.isdigit():
+            self.product_index.learn(reference, product_id)
+        with span("open_edit", reference):
+            async with page.expect_navigation(wait_until=self.wait_until):
+                await rows.locator(EDIT_LINK_SELECTOR).first.click()
+        return None
+
+    async def perform_search_and_uncheck(self, page, reference) -> str:
+        """
+        Opens the edit page of a product and unchecks the active checkbox.
+
+        The edit page is opened directly when the product id of the reference
+        is indexed, and through a search otherwise (or if the id is stale).
+
+        Returns:
+            str: STATUS_OK, STATUS_NOT_FOUND when no search result has the reference,
+            STATUS_AMBIGUOUS when several do, or STATUS_FAILED on any other error.
+        """
+        span = self.timer.span
+        try:
+            product_id = self.product_ids.get(reference)
+            if product_id is None or not await self._open_by_id(page, reference, product_id):
+                status = await self._open_by_search(page, reference)
+                if status is not None:
+                    return status
+
+            checkbox_selector = 'img[alt="Décocher tout"]'
+            with span("uncheck", reference):
+                await page.wait_for_selector(checkbox_selector, timeout=5000)
+                logger.info("Unchecking the checkbox...")
+                await page.click(checkbox_selector)
 
             logger.info("Submitting changes...")
-            await page.click('form[name="prodForm"] button:has-text("Mettre à jour")')
+            with span("submit", reference):
+                async with page.expect_navigation(wait_until=self.wait_until):
+                    await page.click(f'{PRODUCT_FORM_SELECTOR} button:has-text("Mettre à jour")')
             logger.info(f"Successfully processed reference: {reference}")
-            return True
+            return STATUS_OK
         except Exception as e:
             logger.error(f"Error processing reference {reference}: {e}")
-            return False
+            return STATUS_FAILED
 
-    async def run_automation(self, references, headless=True):
-        """Runs the automation process for multiple references."""
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=headless)
-            page = await browser.new_page()
+    async def _process_with_retries(self, page, reference):
+        """
+        Processes one reference, retrying failures with exponential backoff.
 
-            # Perform login
-            if not await self.login(page):
+        Returns:
+            tuple: (status, attempts)
+        """
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            status = await self.perform_search_and_uncheck(page, reference)
+            if status != STATUS_FAILED or attempt == MAX_ATTEMPTS:
+                return status, attempt
+            delay = RETRY_BASE_DELAY * 2 ** (attempt - 1)
+            logger.warning(f"Retrying reference {reference} in {delay:.0f}s (attempt {attempt} failed).")
+            await asyncio.sleep(delay)
+
+    async def _process(self, context, page, reference, results, on_result=None, recorder=None):
+        """Processes one reference on a worker page and records its outcome."""
+        logger.info(f"Processing reference: {reference}")
+        if recorder is not None:
+            await recorder.start_chunk(context)
+        with self.timer.span(TOTAL_STEP, reference):
+            status, attempts = await self._process_with_retries(page, reference)
+        if recorder is not None:
+            await recorder.stop_chunk(context, reference)
+        if status != STATUS_OK:
+            logger.error(f"Failed to process reference: {reference} ({status})")
+        if self.journal is not None:
+            self.journal.record(JOURNAL_ACTION, reference, status, attempts)
+        results[reference] = status
+        if on_result is not None:
+            on_result(reference, status)
+
+    async def run_automation(
+        self, references, headless=True, concurrency=1, on_result=None, skip_done=True,
+        skip_window=DEFAULT_SKIP_WINDOW_HOURS * 3600,
+    ):
+        """
+        Runs the automation process for multiple references.
+
+        Logs in once (or reuses the cached session), then spreads the references over `concurrency` browser
+        contexts that share the authenticated storage state. `on_result(reference, status)` is called as
+        each reference completes. With a journal and `skip_done`, references already deactivated (or not
+        found) by a run of the last `skip_window` seconds (any earlier run if None) are reported as
+        STATUS_SKIPPED without being processed again. References
+        with a product id in `product_index` skip the search and open their edit page directly.
+
+        Every step is timed into `self.timer`; with `trace_slowest`, a Playwright trace is recorded per
+        reference and those of the slowest references are kept in `self.traces`.
+
+        Returns:
+            dict: Reference -> STATUS_* for every reference, or None if login failed.
+        """
+        results = {}
+        self.timer = StepTimer()
+        self.traces = {}
+        if self.journal is not None and skip_done:
+            done = self.journal.references_with_status(JOURNAL_ACTION, DONE_STATUSES, references, skip_window)
+            for reference in done:
+                results[reference] = STATUS_SKIPPED
+                if on_result is not None:
+                    on_result(reference, STATUS_SKIPPED)
+            if len(results) == len(set(references)):
+                return {reference: results[reference] for reference in references}
+
+        pending = [reference for reference in dict.fromkeys(references) if reference not in results]
+        workers = max(1, min(concurrency, len(pending)))
+        self.product_ids = self.product_index.product_ids(references) if self.product_index is not None else {}
+
+        browser = open_browser_session(
+            "deactivation", self.browser_pool, headless=headless, lean=self.lean, contexts=workers
+        )
+        async with browser as browser_session:
+            self.last_run_stats = browser_session.stats
+            browser_session.stats.units = len(pending)
+
+            # Reuse the cached session, or perform login
+            login_context = await open_admin_context(
+                browser_session, self.username, self.login, self.session_cache
+            )
+            if login_context is None:
                 logger.error("Login failed. Aborting automation.")
-                await browser.close()
-                return False
+                return None
+            contexts = await clone_admin_contexts(browser_session, login_context, workers)
 
-            # Process references
-            for reference in references:
-                logger.info(f"Processing reference: {reference}")
-                success = await self.perform_search_and_uncheck(page, reference)
-                if not success:
-                    logger.error(f"Failed to process reference: {reference}")
+            recorder = TraceRecorder(uuid.uuid4().hex[:12], self.trace_slowest) if self.trace_slowest else None
+            if recorder is not None:
+                for context in contexts:
+                    await recorder.start(context)
+            await process_queue(
+                contexts, pending,
+                lambda context, page, reference: self._process(context, page, reference, results, on_result, recorder),
+            )
+            if recorder is not None:
+                for context in contexts:
+                    await recorder.stop(context)
+                self.traces = recorder.keep_slowest(self.timer)
 
-            await browser.close()
-            return True
+            return {reference: results[reference] for reference in references}
 
 
 class ProductDeactivationApp:
@@ -108,6 +315,11 @@ class ProductDeactivationApp:
         self.password = None
         self.references = []
         self.headless = True
+        self.concurrency = DEFAULT_CONCURRENCY
+        self.lean = True
+        self.skip_done = True
+        self.skip_window_hours = DEFAULT_SKIP_WINDOW_HOURS
+        self.trace_slowest = 0
 
     def run(self):
         """Launches the Streamlit interface."""
@@ -119,27 +331,124 @@ class ProductDeactivationApp:
         references_text = st.text_area("Product References (one per line)")
         self.references = [ref.strip() for ref in references_text.splitlines() if ref.strip()]
         self.headless = st.checkbox("Run in headless mode?", value=True)
+        self.concurrency = st.slider(
+            "Parallel browser workers", min_value=1, max_value=MAX_CONCURRENCY, value=DEFAULT_CONCURRENCY
+        )
+        self.lean = st.checkbox(
+            "Lean browser (skip images, fonts and third-party requests)?", value=True
+        )
+        self.skip_done = st.checkbox("Skip references already deactivated by a recent run?", value=True)
+        if self.skip_done:
+            self.skip_window_hours = st.number_input(
+                "Skip the references deactivated or not found in the last (hours)",
+                min_value=1, max_value=24 * 30, value=DEFAULT_SKIP_WINDOW_HOURS,
+                help="Older outcomes are ignored, so reactivated or newly created products are processed again.",
+            )
+        if st.checkbox("Record Playwright traces of the slowest references?", value=False):
+            self.trace_slowest = st.number_input(
+                "Traces kept", min_value=1, max_value=50, value=DEFAULT_TRACED_REFERENCES,
+                help="Every reference is traced; only the traces of the slowest ones are kept.",
+            )
 
-        # Start automation button
-        if st.button("Start Deactivation"):
+        # Start automation buttons
+        start, retry, clear = st.columns(3)
+        if start.button("Start Deactivation"):
             if self.username and self.password and self.references:
                 st.info("Starting deactivation process...")
-                self.start_automation()
+                self.start_automation(self.references)
             else:
                 st.warning("Please fill out all required fields.")
+        if retry.button("Retry failed only"):
+            self.retry_failed()
+        if clear.button("Clear journal"):
+            self.clear_journal()
+
+        job = current_job("deactivation")
+        if job is not None:
+            self.show_job(job)
+
+    def retry_failed(self):
+        """Replays the journaled failures of the entered references (or of all references if none)."""
+        if not self.username or not self.password:
+            st.warning("Please fill out your username and password.")
+            return
+        failed = get_journal().references_with_status(JOURNAL_ACTION, (STATUS_FAILED,), self.references or None)
+        if not failed:
+            st.info("No failed references in the journal.")
+            return
+        st.info(f"Retrying {len(failed)} failed references...")
+        self.start_automation(failed)
+
+    def clear_journal(self):
+        """Forgets the journaled outcomes of the entered references (or of all references if none)."""
+        cleared = get_journal().clear(JOURNAL_ACTION, self.references or None)
+        scope = "the entered references" if self.references else "all references"
+        st.info(f"Cleared {cleared} journaled outcomes of {scope}; they will be processed again.")
+
+    def start_automation(self, references):
+        """Submits the deactivation as a background job and selects it in the URL."""
+        deactivator = ProductDeactivator(
+            self.username, self.password, lean=self.lean, browser_pool=get_job_runner().browser_pool,
+            journal=get_journal(), trace_slowest=self.trace_slowest, product_index=get_product_index(),
+        )
+        headless, concurrency, skip_done = self.headless, self.concurrency, self.skip_done
+        skip_window = self.skip_window_hours * 3600
+
+        def on_result(job, reference, status):
+            job.record(reference, status, status in (STATUS_OK, STATUS_SKIPPED))
+
+        async def run_job(job):
+            # Index the product ids of the brands scraped since the last run
+            await asyncio.to_thread(deactivator.product_index.refresh, SnapshotStore())
+            results = await deactivator.run_automation(
+                references, headless, concurrency,
+                on_result=lambda reference, status: on_result(job, reference, status),
+                skip_done=skip_done, skip_window=skip_window,
+            )
+            if deactivator.last_run_stats:
+                job.summary = deactivator.last_run_stats.summary()
+            job.timings, job.traces = deactivator.timer, deactivator.traces
+            return results
+
+        job = get_job_runner().submit(
+            "deactivation", f"Deactivation of {len(set(references))} references", run_job,
+            total=len(set(references)), unit="references",
+        )
+        st.query_params[JOB_QUERY_PARAM] = job.id
+
+    def show_job(self, job):
+        """Follows a deactivation job and shows its results once it has finished."""
+        job = follow_job(job)
+        if job is None or job.status != JOB_DONE:
+            return
+        if job.result is None:
+            st.error("Login failed. Please check your credentials.")
+            return
+        self.show_results(job.result)
+
+    def show_results(self, results):
+        """Displays the per-reference outcome of a deactivation run."""
+        ok = sum(1 for status in results.values() if status == STATUS_OK)
+        not_found = sum(1 for status in results.values() if status == STATUS_NOT_FOUND)
+        failed = sum(1 for status in results.values() if status == STATUS_FAILED)
+        skipped = sum(1 for status in results.values() if status == STATUS_SKIPPED)
+        ambiguous = sum(1 for status in results.values() if status == STATUS_AMBIGUOUS)
 
-    def start_automation(self):
-        """Initiates the deactivation process."""
-        with st.spinner("Running automation..."):
-            try:
-                deactivator = ProductDeactivator(self.username, self.password)
-                asyncio.run(deactivator.run_automation(self.references, self.headless))
-                st.success("Deactivation completed successfully.")
-            except Exception as e:
-                st.error(f"An error occurred: {e}")
+        if ok + skipped == len(results):
+            st.success(f"Deactivation completed successfully for {ok} references ({skipped} already done).")
+        else:
+            st.warning(
+                f"Deactivated: {ok}, not found: {not_found}, failed: {failed}, already done: {skipped}, "
+                f"several products with the reference: {ambiguous}."
+            )
+        st.dataframe(
+            [{"Reference": reference, "Status": status} for reference, status in results.items()],
+            use_container_width=True,
+        )
 
 
 # Run the Streamlit app
 if __name__ == "__main__":
-    app = ProductDeactivationApp()
-    app.run()
+    with page_load_timer("Product Deactivation"):
+        app = ProductDeactivationApp()
+        app.run()
@@ -1,10 +1,22 @@
 
 import streamlit as st
-import pdfplumber
-import pandas as pd
+import io
 import os
-import tempfile
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from utils.characteristics import characteristics_frame, get_characteristics_index
+from utils.exports import CSV, PARQUET, XLSX, TablesWorkbook, download_buttons, export_tables
+from utils.pdf_extract import DEFAULT_WORKERS, chunk_pages, extract_page_tables, init_worker, page_count
+from utils.memo_cache import file_digest, get_memo_cache
+from utils.pdf_page_cache import get_pdf_page_cache
+from utils.pdf_prescan import candidate_pages, parse_page_range
+from utils.startup import page_load_timer
+
+# Products shown side by side when comparing catalogs
+MAX_COMPARED_PRODUCTS = 20
 
 
 class PDFExtractor:
@@ -12,55 +24,172 @@ class PDFExtractor:
         self.pdf_path = pdf_path
         self.products = {}
         self.all_tables = []
+        self.cached_pages = 0
+
+    def _add_table(self, table, keep=True):
+        """Adds one extracted table's columns to the products dict, and the table to all_tables if `keep`."""
+        if keep:
+            self.all_tables.append(table)
+        headers = table[0]
+        for col in range(len(headers)):
+            product_name = headers[col]
+            if product_name and product_name.strip():
+                if product_name not in self.products:
+                    self.products[product_name] = {}
+                for row in table[1:]:
+                    if len(row) > col:
+                        characteristic = row[0]
+                        value = row[col]
+                        if characteristic and value:
+                            self.products[product_name][characteristic.strip()] = value.strip()
+
+    def _source(self):
+        """Returns the PDF as something worker processes can open: a path or the raw bytes."""
+        if isinstance(self.pdf_path, (str, os.PathLike)):
+            return str(self.pdf_path)
+        self.pdf_path.seek(0)
+        return self.pdf_path.read()
+
+    def select_pages(self, prescan=True, page_range=None):
+        """
+        Chooses the pages worth extracting.
+
+        Args:
+            prescan: Skip pages that the pypdfium2 pre-scan finds table-free.
+            page_range: Optional 1-based range such as "1-20, 35".
+
+        Returns:
+            tuple: (sorted 0-based page numbers, total page count, pre-scan seconds)
+        """
+        source = self._source()
+        total = page_count(source)
+        pages = parse_page_range(page_range, total) if page_range else list(range(total))
+        if not prescan:
+            return pages, total, 0.0
+        pages, seconds = candidate_pages(source, pages)
+        return pages, total, seconds
 
-    def extract_product_data(self):
+    def iter_page_tables(self, workers=1, on_page=None, page_numbers=None, cache=None):
+        """
+        Yields (page number, tables) in page order, one page at a time.
+
+        With a PdfPageCache, pages whose content was extracted before (in this
+        or any earlier upload) are read from the cache, and only the other
+        pages are extracted and then stored.
+
+        Page caches are released as soon as a page is extracted. With several
+        workers, only a bounded window of page chunks is in flight, so memory
+        does not grow with the document.
+
+        Args:
+            workers: Number of processes; above 1 the pages are split across a process pool.
+            on_page: Called with (pages done, pages to do) as pages complete.
+            page_numbers: 0-based pages to extract, defaults to every page.
+            cache: Optional PdfPageCache.
+        """
+        if cache is None:
+            yield from self._extract_pages(workers, on_page, page_numbers)
+            return
+
+        source = self._source()
+        page_numbers = list(range(page_count(source))) if page_numbers is None else list(page_numbers)
+        fingerprints = cache.fingerprints(source, page_numbers)
+        misses = [page_num for page_num in page_numbers if not cache.has(fingerprints[page_num])]
+        missed = set(misses)
+        self.cached_pages = len(page_numbers) - len(misses)
+        # Missed pages are extracted in page order, so each result matches the next missed page
+        extracted = self._extract_pages(workers, None, misses)
+        for done, page_num in enumerate(page_numbers, start=1):
+            fingerprint = fingerprints[page_num]
+            if page_num in missed:
+                _, tables = next(extracted)
+                cache.put(fingerprint, tables)
+            else:
+                tables = cache.get(fingerprint)
+                if tables is None:  # Evicted since the lookup
+                    _, tables = next(self._extract_pages(1, None, [page_num]))
+                    cache.put(fingerprint, tables)
+            if on_page is not None:
+                on_page(done, len(page_numbers))
+            yield page_num, tables
+        cache.evict()
+
+    def _extract_pages(self, workers=1, on_page=None, page_numbers=None):
+        """Extracts the tables of the pages, serially or across a process pool (see iter_page_tables)."""
+        if workers <= 1:
+            import pdfplumber
+
+            with pdfplumber.open(self.pdf_path) as pdf:
+                page_numbers = range(len(pdf.pages)) if page_numbers is None else page_numbers
+                for done, page_num in enumerate(page_numbers, start=1):
+                    page = pdf.pages[page_num]
+                    tables = page.extract_tables()
+                    page.close()
+                    if on_page is not None:
+                        on_page(done, len(page_numbers))
+                    yield page_num, tables
+            return
+
+        source = self._source()
+        page_numbers = list(range(page_count(source))) if page_numbers is None else list(page_numbers)
+        chunks = iter(chunk_pages(page_numbers, workers))
+        done = 0
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=init_worker, initargs=(source,)
+        ) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(extract_page_tables, chunk))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                results = pending.popleft().result()
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    pending.append(executor.submit(extract_page_tables, next_chunk))
+                for page_num, tables in results:
+                    done += 1
+                    if on_page is not None:
+                        on_page(done, len(page_numbers))
+                    yield page_num, tables
+
+    def extract_product_data(self, workers=1, on_page=None, page_numbers=None, cache=None):
         """
         Extracts product data and all tables from the PDF.
 
+        Args:
+            workers: Number of processes; above 1 the pages are split across a
+                process pool, and the results are merged back in page order.
+            on_page: Called with (pages done, pages to do) as pages complete.
+            page_numbers: 0-based pages to extract, defaults to every page.
+            cache: Optional PdfPageCache of already extracted pages.
+
         Returns:
             tuple: A tuple containing the product data dictionary and all extracted tables.
         """
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                tables = page.extract_tables()
-                for table_num, table in enumerate(tables):
-                    self.all_tables.append(table)
-                    headers = table[0]
-                    for col in range(len(headers)):
-                        product_name = headers[col]
-                        if product_name and product_name.strip():
-                            if product_name not in self.products:
-                                self.products[product_name] = {}
-                            for row in table[1:]:
-                                if len(row) > col:
-                                    characteristic = row[0]
-                                    value = row[col]
-                                    if characteristic and value:
-                                        self.products[product_name][characteristic.strip()] = value.strip()
+        for _, tables in self.iter_page_tables(workers, on_page, page_numbers, cache):
+            for table in tables:
+                self._add_table(table)
         return self.products, self.all_tables
 
-
-class ExcelSaver:
-    def __init__(self, all_tables):
-        self.all_tables = all_tables
-
-    def save_to_tempfile(self):
+    def stream_to_excel(self, output, workers=1, on_page=None, page_numbers=None, cache=None):
         """
-        Saves the extracted tables to a temporary Excel file.
+        Extracts the PDF page by page and writes each table to the workbook as it is found.
+
+        Tables are not kept in memory (all_tables stays empty), so peak memory
+        stays flat regardless of the page count.
 
         Returns:
-            str: The path to the temporary Excel file.
+            tuple: The product data dictionary and the number of tables written.
         """
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as temp_file:
-            temp_file_path = temp_file.name
-            with pd.ExcelWriter(temp_file_path) as writer:
-                row_position = 0
-                for table_index, table in enumerate(self.all_tables):
-                    df = pd.DataFrame(table[1:], columns=table[0])  # Create DataFrame
-                    df.to_excel(writer, sheet_name='Extracted Data', startrow=row_position, index=False, header=True)
-                    row_position += len(df) + 2  # Add space between tables
-        return temp_file_path
+        saver = TablesWorkbook(output)
+        for _, tables in self.iter_page_tables(workers, on_page, page_numbers, cache):
+            for table in tables:
+                self._add_table(table, keep=False)
+                saver.write_table(table)
+        saver.close()
+        return self.products, saver.table_count
 
 
 class PDFExtractorApp:
@@ -76,39 +205,125 @@ class PDFExtractorApp:
         uploaded_file = st.file_uploader("Upload your PDF file", type="pdf")
 
         if uploaded_file:
-            self._process_pdf(uploaded_file)
+            workers = st.number_input(
+                "Worker processes", min_value=1, max_value=os.cpu_count() or 1, value=DEFAULT_WORKERS,
+                help="Pages are split across this many processes; 1 extracts them one by one.",
+            )
+            streaming = st.checkbox(
+                "Streaming mode (constant memory, for very large catalogs)", value=False,
+                help="Writes each table to the workbook as soon as it is extracted.",
+            )
+            prescan = st.checkbox(
+                "Skip pages without tables (fast pre-scan)", value=True,
+                help="Pages without any ruling lines or boxes cannot contain a table and are not extracted.",
+            )
+            page_range = st.text_input("Pages to extract (optional, e.g. 1-20, 35)").strip()
+            index_as = st.text_input(
+                "Add the characteristics to the cross-catalog index as (optional)",
+                value="", placeholder=Path(uploaded_file.name).stem,
+                help="Indexed catalogs can be compared below without parsing their PDFs again.",
+            ).strip()
+            reuse = st.checkbox(
+                "Reuse tables from earlier uploads", value=True,
+                help="Pages unchanged since an earlier upload (even of another revision) are not extracted again.",
+            )
+            self._process_pdf(uploaded_file, workers, streaming, prescan, page_range, reuse, index_as)
         else:
             st.info("Please upload a PDF file to begin.")
 
-    def _process_pdf(self, uploaded_file):
+        self._compare_catalogs()
+
+        with st.sidebar:
+            page_cache = get_pdf_page_cache()
+            st.caption(f"PDF page cache: {page_cache.size() / 1024 / 1024:.1f} MB")
+            if st.button("Clear PDF cache"):
+                page_cache.clear()
+                get_memo_cache().clear()
+                st.rerun()
+
+    def _process_pdf(
+        self, uploaded_file, workers=1, streaming=False, prescan=True, page_range="", reuse=True, index_as=""
+    ):
         """Handles PDF extraction and saving to Excel."""
-        if st.button("Extract and Save to Temp File"):
+        if st.button("Extract Tables"):
             with st.spinner("Processing the PDF..."):
                 try:
-                    # Extract data
                     pdf_extractor = PDFExtractor(uploaded_file)
-                    _, all_tables = pdf_extractor.extract_product_data()
+                    page_numbers, total, prescan_seconds = pdf_extractor.select_pages(prescan, page_range)
+                    page_cache = get_pdf_page_cache() if reuse else None
+                    progress = st.progress(0.0, text="Extracting tables...")
+                    started = time.perf_counter()
 
-                    # Save to a temporary Excel file
-                    excel_saver = ExcelSaver(all_tables)
-                    temp_excel_file = excel_saver.save_to_tempfile()
+                    def on_page(done, total):
+                        progress.progress(done / total, text=f"Extracted page {done}/{total}")
 
-                    # Provide download link to the user
-                    with open(temp_excel_file, "rb") as file:
-                        st.download_button(
-                            label="Download Excel File",
-                            data=file,
-                            file_name="Extracted_Tables.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    if streaming:
+                        # Extract and write page by page into the in-memory workbook
+                        output = io.BytesIO()
+                        products, _ = pdf_extractor.stream_to_excel(
+                            output, workers, on_page, page_numbers, page_cache
+                        )
+                        excel_data = output
+                    else:
+                        # Extract data, reusing the result of an identical upload
+                        products, all_tables = get_memo_cache().get_or_compute(
+                            ("pdf", file_digest(uploaded_file), tuple(page_numbers)),
+                            lambda: pdf_extractor.extract_product_data(workers, on_page, page_numbers, page_cache),
                         )
 
+                        excel_data = export_tables(all_tables)
+                    progress.empty()
+                    st.caption(
+                        f"Pre-scan: {prescan_seconds:.2f} s, {len(page_numbers)} of {total} pages kept. "
+                        f"Extraction: {time.perf_counter() - started:.2f} s"
+                        f" ({pdf_extractor.cached_pages} pages from the cache)."
+                    )
+
+                    # Provide download link to the user
+                    st.download_button(
+                        label="Download Excel File",
+                        data=excel_data,
+                        file_name="Extracted_Tables.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
+
+                    self._show_characteristics(characteristics_frame(products, index_as), index_as)
+
                     # Show success message and animation
                     st.success("Data extraction successful! Click the button to download.")
                     st.balloons()  # Display a festive animation for success
                 except Exception as e:
                     st.error(f"An error occurred: {e}")
 
+    def _show_characteristics(self, frame, index_as=""):
+        """Offers the (product, characteristic, value) table for download, and indexes it if asked."""
+        st.subheader(f"Characteristics ({len(frame)} values)")
+        st.dataframe(frame, use_container_width=True, height=250)
+        download_buttons(frame, "Characteristics", formats=(PARQUET, XLSX, CSV), sheet_name="Characteristics")
+        if index_as:
+            get_characteristics_index().add(index_as, frame)
+            st.caption(f"Added to the cross-catalog index as {index_as}.")
+
+    def _compare_catalogs(self):
+        """Looks up products or characteristics across every indexed catalog."""
+        index = get_characteristics_index()
+        catalogs = index.catalogs()
+        if not catalogs:
+            return
+        st.subheader("Compare specs across catalogs")
+        st.caption(f"Indexed catalogs: {', '.join(catalogs)}")
+        search = st.text_input("Product name contains").strip()
+        products = index.search_products(search)[:MAX_COMPARED_PRODUCTS] if search else None
+        characteristics = st.multiselect("Characteristics", index.characteristics()) or None
+        if products is None and characteristics is None:
+            return
+        if products == []:
+            st.info("No indexed product matches this name.")
+            return
+        st.dataframe(index.compare(products, characteristics), use_container_width=True)
+
 
 if __name__ == "__main__":
-    app = PDFExtractorApp()
-    app.run()
+    with page_load_timer("PDF to Excel Extractor"):
+        app = PDFExtractorApp()
+        app.run()
@@ -1,92 +1,290 @@
 
 import streamlit as st
 from datetime import datetime
-from plyer import notification
+import numpy as np
 import pandas as pd
-import altair as alt
-import re
-import tempfile
+import asyncio
 import sys
+from utils.catalog_loader import (
+    PRICE_ALIASES, REFERENCE_ALIASES, SUPPORTED_TYPES, list_columns, list_sheets, load_catalog, resolve_column,
+)
+from utils.exports import download_buttons
+from utils.job_view import JOB_QUERY_PARAM, current_job, follow_job
+from utils.jobs import JOB_DONE, get_job_runner
+from utils.journal import get_journal
+from utils.memo_cache import file_digest, get_memo_cache
+from utils.price_push import (
+    DEFAULT_CONCURRENCY, DEFAULT_PRICE_FIELD, MAX_CONCURRENCY, NON_PRICE_CHARS, OK_STATUSES, STATUS_WOULD_UPDATE,
+    THOUSANDS_SEPARATORS, PricePusher, parse_price,
+)
+from utils.product_index import get_product_index
+from utils.session_cache import SessionCache
+from utils.snapshot_store import SnapshotStore
+from utils.startup import page_load_timer
+
+
+# Columns of the price changes table, and the filters of its view
+DIFFERENCE_COLUMN = 'Difference'
+CHANGE_PCT_COLUMN = 'Change (%)'
+DIRECTION_ALL = 'All'
+DIRECTION_UP = 'Increases'
+DIRECTION_DOWN = 'Decreases'
+PAGE_SIZES = [50, 100, 500, 1000]
+PRICE_COLUMN_CONFIG = {
+    'Old Price': st.column_config.NumberColumn(format="%.2f"),
+    'New Price': st.column_config.NumberColumn(format="%.2f"),
+    'Price': st.column_config.NumberColumn(format="%.2f"),
+    DIFFERENCE_COLUMN: st.column_config.NumberColumn(format="%+.2f"),
+    CHANGE_PCT_COLUMN: st.column_config.NumberColumn(format="%+.1f %%"),
+}
 
 
 class PriceUpdateLogic:
     def __init__(self):
-        self.price_changes = []
-        self.new_products = []
-        self.products_to_deactivate = []
+        self.price_changes = pd.DataFrame(columns=['Reference', 'Old Price', 'New Price'])
+        self.new_products = pd.DataFrame(columns=['Reference', 'Price'])
+        self.products_to_deactivate = pd.DataFrame(columns=['Reference'])
+        self.duplicate_references = pd.DataFrame(columns=['File', 'Reference', 'Occurrences'])
 
     @staticmethod
     def clean_price(price):
-        """Cleans and standardizes a single price string."""
+        """Cleans and standardizes a single price string ("1 896,10 €" -> 1896.1)."""
         if price is None or price == "":
             return None
-        try:
-            cleaned = re.sub(r"[^\d.]", "", str(price))
-            return float(cleaned) if cleaned else None
-        except ValueError:
-            return None
+        return parse_price(price)
 
-    def compare_files(self, file1, file2):
-        """Compares two Excel files and identifies changes, additions, and removals."""
-        old_data = pd.read_excel(file1).set_index('Reference').to_dict(orient='index')
-        new_data = pd.read_excel(file2).set_index('Reference').to_dict(orient='index')
+    @staticmethod
+    def clean_prices(prices):
+        """Vectorized clean_price: unparseable or empty prices become NaN."""
+        # Numbers and plain numeric strings need no regex; only the rest is cleaned
+        cleaned = pd.to_numeric(prices, errors='coerce').astype(float).abs()
+        needs_cleaning = (cleaned.isna() | np.isinf(cleaned)) & prices.notna()
+        if not pd.api.types.is_numeric_dtype(prices.dtype):
+            # to_numeric reads "1e3" as 1000; clean_price only keeps its digits
+            needs_cleaning |= np.fromiter(
+                (isinstance(value, str) and 'e' in value.lower() for value in prices.to_numpy()), bool, len(prices)
+            )
+        if needs_cleaning.any():
+            stripped = (
+                prices[needs_cleaning].astype(str)
+                .str.replace(NON_PRICE_CHARS, "", regex=True)
+                .str.replace(THOUSANDS_SEPARATORS, "", regex=True)
+                .str.replace(",", ".", regex=False)
+            )
+            cleaned[needs_cleaning] = pd.to_numeric(stripped, errors='coerce')
+        return cleaned.where(np.isfinite(cleaned))
 
-        for ref in old_data:
-            old_data[ref]['Price'] = self.clean_price(old_data[ref].get('Price'))
+    @staticmethod
+    def clean_references(references):
+        """Returns references as stripped strings, so numeric and text references match (12345.0 -> "12345")."""
+        if pd.api.types.infer_dtype(references, skipna=False) != 'string':
+            references = references.map(
+                lambda value: str(int(value)) if isinstance(value, float) and value.is_integer() else str(value)
+            )
+        return references.str.strip()
 
-        for ref in new_data:
-            new_data[ref]['Price'] = self.clean_price(new_data[ref].get('Price'))
+    @staticmethod
+    def _find_duplicates(df, label):
+        """Returns the references that appear more than once in a file, with their count."""
+        counts = df['Reference'].value_counts()
+        duplicates = counts[counts > 1]
+        return pd.DataFrame({'File': label, 'Reference': duplicates.index, 'Occurrences': duplicates.values})
+
+    def compare_frames(self, old_df, new_df):
+        """
+        Compares two catalogs with Reference and Price columns.
+
+        References are compared as stripped strings. Duplicate references are
+        reported in `duplicate_references`; the last occurrence of each is the one compared.
+
+        Returns:
+            tuple: (price_changes, new_products, products_to_deactivate) DataFrames.
+        """
+        old = pd.DataFrame({'Reference': self.clean_references(old_df['Reference']),
+                            'Price': self.clean_prices(old_df['Price'])})
+        new = pd.DataFrame({'Reference': self.clean_references(new_df['Reference']),
+                            'Price': self.clean_prices(new_df['Price'])})
+        self.duplicate_references = pd.concat(
+            [self._find_duplicates(old, 'Older file'), self._find_duplicates(new, 'Newer file')],
+            ignore_index=True,
+        )
+        old = old.drop_duplicates('Reference', keep='last')
+        new = new.drop_duplicates('Reference', keep='last')
+
+        merged = new.merge(old, on='Reference', how='outer', suffixes=(' new', ' old'), indicator=True, sort=False)
+        in_both = merged['_merge'] == 'both'
+        old_price, new_price = merged['Price old'], merged['Price new']
+        unchanged = (old_price == new_price) | (old_price.isna() & new_price.isna())
+
+        changed = merged[in_both & ~unchanged]
+        self.price_changes = pd.DataFrame({
+            'Reference': changed['Reference'].to_numpy(),
+            'Old Price': changed['Price old'].to_numpy(),
+            'New Price': changed['Price new'].to_numpy(),
+        })
+        added = merged[merged['_merge'] == 'left_only']
+        self.new_products = pd.DataFrame({
+            'Reference': added['Reference'].to_numpy(),
+            'Price': added['Price new'].to_numpy(),
+        })
+        removed = merged[merged['_merge'] == 'right_only']
+        self.products_to_deactivate = pd.DataFrame({'Reference': removed['Reference'].to_numpy()})
+
+        return self.price_changes, self.new_products, self.products_to_deactivate
+
+    def compare_files(self, file1, file2, old_options=None, new_options=None, cache=None):
+        """
+        Compares two catalog files and identifies changes, additions, and removals.
+
+        Only the reference and price columns are read; `old_options` and
+        `new_options` are passed to load_catalog (sheet_name, reference_column, price_column).
+        With a MemoCache, parsed catalogs and the diff are reused for identical file contents.
+
+        Returns:
+            tuple: The content key of the comparison.
+        """
+        old_options, new_options = old_options or {}, new_options or {}
+        old_key = ('catalog', file_digest(file1), repr(sorted(old_options.items())))
+        new_key = ('catalog', file_digest(file2), repr(sorted(new_options.items())))
+        diff_key = ('diff', old_key, new_key)
+        if cache is None:
+            self.compare_frames(load_catalog(file1, **old_options), load_catalog(file2, **new_options))
+            return diff_key
+
+        def compare():
+            old_df = cache.get_or_compute(old_key, lambda: load_catalog(file1, **old_options))
+            new_df = cache.get_or_compute(new_key, lambda: load_catalog(file2, **new_options))
+            self.compare_frames(old_df, new_df)
+
+        self._memoized(cache, diff_key, compare)
+        return diff_key
+
+    def _memoized(self, cache, key, compare):
+        """Runs `compare`, which sets the result attributes, or restores its cached results."""
+        def compute():
+            compare()
+            return self.price_changes, self.new_products, self.products_to_deactivate, self.duplicate_references
+
+        (self.price_changes, self.new_products,
+         self.products_to_deactivate, self.duplicate_references) = cache.get_or_compute(key, compute)
 
-        price_changes = []
-        new_products = []
-        products_to_deactivate = []
+    @staticmethod
+    def _snapshot_catalog(store, marque, snapshot_id):
+        df = store.load(marque, snapshot_id)
+        reference = resolve_column(df.columns, None, REFERENCE_ALIASES)
+        price = resolve_column(df.columns, None, PRICE_ALIASES)
+        return pd.DataFrame({'Reference': df[reference], 'Price': df[price]})
+
+    def compare_snapshots(self, store, marque, old_snapshot, new_snapshot=None, cache=None):
+        """
+        Compares two stored scrapes of a marque; the newer one defaults to the latest snapshot.
+
+        Returns:
+            tuple: The key of the comparison.
+        """
+        new_snapshot = new_snapshot or store.latest(marque)
+        diff_key = ('snapshots', str(store.root), marque, old_snapshot, new_snapshot)
+
+        def compare():
+            self.compare_frames(
+                self._snapshot_catalog(store, marque, old_snapshot),
+                self._snapshot_catalog(store, marque, new_snapshot),
+            )
 
-        for ref, new_row in new_data.items():
-            if ref in old_data:
-                old_price = old_data[ref].get('Price')
-                new_price = new_row.get('Price')
-                if old_price != new_price:
-                    price_changes.append((ref, old_price, new_price))
-            else:
-                new_products.append((ref, new_row.get('Price')))
+        if cache is None:
+            compare()
+        else:
+            self._memoized(cache, diff_key, compare)
+        return diff_key
 
-        for ref in old_data:
-            if ref not in new_data:
-                products_to_deactivate.append(ref)
+    @staticmethod
+    def change_table(price_changes):
+        """Adds the numeric Difference and Change (%) columns to the price changes (no change % from a zero price)."""
+        old, new = price_changes['Old Price'], price_changes['New Price']
+        difference = new - old
+        return price_changes.assign(**{
+            DIFFERENCE_COLUMN: difference,
+            CHANGE_PCT_COLUMN: (difference / old.where(old != 0)) * 100,
+        })
 
-        self.price_changes = price_changes
-        self.new_products = new_products
-        self.products_to_deactivate = products_to_deactivate
+    @staticmethod
+    def change_stats(changes):
+        """Returns the summary figures of a change table, computed in one pass over its columns."""
+        difference, change_pct = changes[DIFFERENCE_COLUMN], changes[CHANGE_PCT_COLUMN]
+        up, down = difference > 0, difference < 0
+        # NaN (shown as "—") when there is no change in that direction
+        return {
+            'count': len(changes),
+            'increases': int(up.sum()),
+            'decreases': int(down.sum()),
+            'median_pct': change_pct.median(),
+            'max_increase_pct': change_pct[up].max(),
+            'max_decrease_pct': change_pct[down].min(),
+        }
 
-    def notify_changes(self):
-        """Sends a notification summarizing the changes."""
+    @staticmethod
+    def filter_changes(changes, search="", direction=DIRECTION_ALL, min_change_pct=0.0, sort_by=None,
+                       descending=False):
+        """
+        Filters and sorts a change table with vectorized masks.
+
+        Args:
+            search: Case-insensitive substring of the reference.
+            direction: DIRECTION_ALL, DIRECTION_UP or DIRECTION_DOWN.
+            min_change_pct: Keeps the changes of at least this many percent, up or down.
+            sort_by: Column to sort on, missing values last.
+        """
+        mask = pd.Series(True, index=changes.index)
+        if search:
+            mask &= changes['Reference'].astype(str).str.contains(search, case=False, regex=False)
+        if direction == DIRECTION_UP:
+            mask &= changes[DIFFERENCE_COLUMN] > 0
+        elif direction == DIRECTION_DOWN:
+            mask &= changes[DIFFERENCE_COLUMN] < 0
+        if min_change_pct:
+            mask &= changes[CHANGE_PCT_COLUMN].abs() >= min_change_pct
+        filtered = changes[mask]
+        if sort_by:
+            filtered = filtered.sort_values(sort_by, ascending=not descending, na_position='last', kind='stable')
+        return filtered.reset_index(drop=True)
+
+    def changes_summary(self):
+        """Returns the plain-text summary of the price changes, new products and products to deactivate."""
+        lines = []
+        if len(self.price_changes):
+            lines.append(f"{len(self.price_changes)} products have price changes:")
+            lines.extend(
+                f"Reference {ref}: Old Price {old}, New Price {new}"
+                for ref, old, new in self.price_changes.itertuples(index=False)
+            )
+        else:
+            lines.append("No price changes detected this week.")
+
+        lines.append("")
+        if len(self.new_products):
+            lines.append(f"{len(self.new_products)} new products found:")
+            lines.extend(f"Reference {ref}, Price: {price}" for ref, price in self.new_products.itertuples(index=False))
+        else:
+            lines.append("No new products found this week.")
+
+        lines.append("")
+        if len(self.products_to_deactivate):
+            lines.append(f"{len(self.products_to_deactivate)} products to deactivate:")
+            lines.extend(f"Reference {ref}" for ref in self.products_to_deactivate['Reference'])
+        else:
+            lines.append("No products to deactivate this week.")
+        return "\n".join(lines) + "\n"
+
+    def notify_changes(self, notify=True, cache_key=None):
+        """Offers the summary of the changes for download and, if `notify`, sends a desktop notification."""
         today = datetime.now().strftime("%Y-%m-%d")
         filename = f"price_changes_{today}.txt"
+        if cache_key is None:
+            summary = self.changes_summary()
+        else:
+            summary = get_memo_cache().get_or_compute(("summary", cache_key), self.changes_summary)
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as temp_file:
-            temp_filename = temp_file.name
-            with open(temp_filename, 'w') as f:
-                if self.price_changes:
-                    f.write(f"{len(self.price_changes)} products have price changes:\n")
-                    for ref, old, new in self.price_changes:
-                        f.write(f"Reference {ref}: Old Price {old}, New Price {new}\n")
-                else:
-                    f.write("No price changes detected this week.\n")
-
-                if self.new_products:
-                    f.write(f"\n{len(self.new_products)} new products found:\n")
-                    for ref, price in self.new_products:
-                        f.write(f"Reference {ref}, Price: {price}\n")
-                else:
-                    f.write("\nNo new products found this week.\n")
-
-                if self.products_to_deactivate:
-                    f.write(f"\n{len(self.products_to_deactivate)} products to deactivate:\n")
-                    for ref in self.products_to_deactivate:
-                        f.write(f"Reference {ref}\n")
-                else:
-                    f.write("\nNo products to deactivate this week.\n")
-        if sys.platform in ['win32', 'darwin', 'linux']:
+        if notify and sys.platform in ['win32', 'darwin', 'linux']:
             try:
                 notification_message = (
                     f"Price changes: {len(self.price_changes)}\n"
@@ -94,6 +292,8 @@ class PriceUpdateLogic:
                     f"Products to deactivate: {len(self.products_to_deactivate)}"
                 )
 
+                from plyer import notification
+
                 notification.notify(
                     title="Product Update Summary",
                     message=notification_message,
@@ -102,76 +302,126 @@ class PriceUpdateLogic:
             except Exception as e:
                 print(f"Error sending notification: {e}")
 
-        with open(temp_filename, 'r') as file:
-            st.download_button(
-                label="Download Price Changes Summary",
-                data=file.read(),
-                file_name=filename,
-                mime="text/plain"
-            )
-
-    def save_new_products(self):
-        """Saves new products to an Excel file."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        new_file = f"new_products_{today}.xlsx"
-        df = pd.DataFrame(self.new_products, columns=['Reference', 'Price'])
-        df.to_excel(new_file, index=False)
-        print(f"New products saved to {new_file}")
+        st.download_button(
+            label="Download Price Changes Summary",
+            data=summary,
+            file_name=filename,
+            mime="text/plain"
+        )
 
 
 class PriceUpdateAppUI:
     def __init__(self):
         self.logic = PriceUpdateLogic()
 
+    @staticmethod
+    def file_options(uploaded_file, label):
+        """Lets the user pick the sheet and the reference/price columns of an upload."""
+        if not uploaded_file:
+            return {}
+        options = {}
+        # Read once per file content, not on every rerun
+        cache, digest = get_memo_cache(), file_digest(uploaded_file)
+        with st.sidebar.expander(f"Columns of the {label} file"):
+            sheets = cache.get_or_compute(("sheets", digest), lambda: list_sheets(uploaded_file))
+            if len(sheets) > 1:
+                options["sheet_name"] = st.selectbox("Sheet", sheets, key=f"{label}_sheet")
+            sheet_name = options.get("sheet_name")
+            columns = cache.get_or_compute(
+                ("columns", digest, sheet_name),
+                lambda: [str(column) for column in list_columns(uploaded_file, sheet_name=sheet_name)],
+            )
+            choices = ["(auto)"] + columns
+            reference = st.selectbox("Reference column", choices, key=f"{label}_reference")
+            price = st.selectbox("Price column", choices, key=f"{label}_price")
+        if reference != "(auto)":
+            options["reference_column"] = reference
+        if price != "(auto)":
+            options["price_column"] = price
+        return options
+
+    def select_uploads(self):
+        """Compares two uploaded catalogs; returns the comparison key once it is done."""
+        file1 = st.sidebar.file_uploader("Select the older catalog file", type=SUPPORTED_TYPES)
+        old_options = self.file_options(file1, "older")
+        file2 = st.sidebar.file_uploader("Select the newer catalog file", type=SUPPORTED_TYPES)
+        new_options = self.file_options(file2, "newer")
+        if not (file1 and file2):
+            return None
+        try:
+            with st.spinner("Comparing files..."):
+                return self.logic.compare_files(file1, file2, old_options, new_options, cache=get_memo_cache())
+        except ValueError as e:
+            st.error(f"Could not read the catalogs: {e}")
+            return None
+
+    def select_snapshots(self):
+        """Compares two stored scrapes of a marque; returns the comparison key once it is done."""
+        store = SnapshotStore()
+        marques = store.list_marques()
+        if not marques:
+            st.info("No stored scrapes yet. Run the Data Scraper to create one.")
+            return None
+        marque = st.sidebar.selectbox("Marque", marques)
+        snapshots = store.list_snapshots(marque)
+        if len(snapshots) < 2:
+            st.info(f"Only one scrape stored for {marque}; scrape it again later to compare.")
+            return None
+        label = lambda snapshot_id: store.timestamp(snapshot_id).astimezone().strftime("%Y-%m-%d %H:%M")
+        new_snapshot = st.sidebar.selectbox("Newer scrape", snapshots, format_func=label)
+        older = [snapshot_id for snapshot_id in snapshots if snapshot_id < new_snapshot]
+        if not older:
+            st.info("Pick a newer scrape that has earlier scrapes to compare with.")
+            return None
+        old_snapshot = st.sidebar.selectbox("Older scrape", older, format_func=label)
+        return self.logic.compare_snapshots(store, marque, old_snapshot, new_snapshot, cache=get_memo_cache())
+
     def run(self):
         st.set_page_config(page_title="Product Update App", layout="wide", initial_sidebar_state="expanded")
         st.title("Product Update App")
         st.sidebar.title("Options")
 
-        file1 = st.sidebar.file_uploader("Select the older Excel file", type=["xlsx"])
-        file2 = st.sidebar.file_uploader("Select the newer Excel file", type=["xlsx"])
-
-        if file1 and file2:
-            self.logic.compare_files(file1, file2)
-            self.logic.notify_changes()
-            # self.logic.save_new_products()
+        source = st.sidebar.radio("Compare", ["Uploaded files", "Stored scrapes"])
+        if source == "Stored scrapes":
+            compared = self.select_snapshots()
+        else:
+            compared = self.select_uploads()
+        if compared:
+            # Only notify once per distinct comparison, not on every rerun
+            self.logic.notify_changes(notify=st.session_state.get("notified_diff") != compared, cache_key=compared)
+            st.session_state["notified_diff"] = compared
 
             st.write(f"Processing completed. {len(self.logic.price_changes)} price changes detected.")
+            today = datetime.now().strftime("%Y-%m-%d")
 
             # Price Changes DataFrame
             st.subheader("Price Changes")
-            price_changes_df = pd.DataFrame(self.logic.price_changes, columns=['Reference', 'Old Price', 'New Price'])
-            price_changes_df['Old Price'] = price_changes_df['Old Price'].apply(lambda x: f"{x:.2f}")
-            price_changes_df['New Price'] = price_changes_df['New Price'].apply(lambda x: f"{x:.2f}")
-            # Calculate the Difference between Old Price and New Price
-            price_changes_df['Difference'] = price_changes_df['New Price'].apply(pd.to_numeric) - price_changes_df['Old Price'].apply(pd.to_numeric)
-
-            # Format the Difference column to show positive differences with a "+" sign
-            price_changes_df['Difference'] = price_changes_df['Difference'].apply(lambda x: f"+{x:.2f}" if x > 0 else f"{x:.2f}")
-
-            # Apply color formatting to the 'Difference' column based on the value
-            def color_difference(val):
-                color = 'green' if float(val) > 0 else 'red'
-                return f'color: {color}'
-
-            # Apply the color formatting function to the 'Difference' column
-            # styled_price_changes_df = price_changes_df.style.applymap(color_difference, subset=['Difference'])
-            styled_price_changes_df = price_changes_df.style.map(color_difference, subset=['Difference'])
+            if len(self.logic.duplicate_references):
+                st.warning(
+                    f"{len(self.logic.duplicate_references)} references appear more than once; "
+                    "the last occurrence of each was compared."
+                )
+                st.dataframe(self.logic.duplicate_references)
 
-            # Display the Price Changes with color formatting in a table
-            st.dataframe(styled_price_changes_df)
+            self.show_price_changes(compared)
+            self.apply_changes(compared)
 
             st.subheader("New Products")
-            new_products_df = pd.DataFrame(self.logic.new_products, columns=['Reference', 'Price'])
-
-            # Format Prices in the New Products table
-            new_products_df['Price'] = new_products_df['Price'].apply(lambda x: f"{x:.2f}")
-
-            st.dataframe(new_products_df)
+            st.dataframe(
+                self.logic.new_products, column_config=PRICE_COLUMN_CONFIG, use_container_width=True, hide_index=True
+            )
+            download_buttons(
+                self.logic.new_products, f"new_products_{today}", cache_key=(compared, "new_products"),
+                sheet_name="New Products",
+            )
 
             st.subheader("Products to Deactivate")
-            products_to_deactivate_df = pd.DataFrame({'Reference': self.logic.products_to_deactivate})
-            st.dataframe(products_to_deactivate_df)
+            products_to_deactivate_df = self.logic.products_to_deactivate
+            st.dataframe(products_to_deactivate_df, use_container_width=True, hide_index=True)
+            download_buttons(
+                products_to_deactivate_df, f"products_to_deactivate_{today}",
+                cache_key=(compared, "products_to_deactivate"), sheet_name="Products to Deactivate",
+            )
 
             st.subheader("Summary")
             summary_data = [
@@ -181,6 +431,8 @@ class PriceUpdateAppUI:
             ]
             summary_df = pd.DataFrame(summary_data)
 
+            import altair as alt
+
             # Change the color for New Products to blue
             chart = alt.Chart(summary_df).mark_bar().encode(
                 x='Metric',
@@ -196,7 +448,181 @@ class PriceUpdateAppUI:
 
 
 
+    def show_price_changes(self, compared):
+        """Shows the price changes a page at a time, filtered and sorted on the server, with their summary figures."""
+        cache = get_memo_cache()
+        changes = cache.get_or_compute(
+            (compared, 'change_table'), lambda: self.logic.change_table(self.logic.price_changes)
+        )
+        stats = cache.get_or_compute((compared, 'change_stats'), lambda: self.logic.change_stats(changes))
+        percent = lambda value: "—" if pd.isna(value) else f"{value:+.1f} %"
+        count, increases, decreases, median = st.columns(4)
+        count.metric("Price changes", stats['count'])
+        increases.metric("Increases", stats['increases'], help=f"Largest: {percent(stats['max_increase_pct'])}")
+        decreases.metric("Decreases", stats['decreases'], help=f"Largest: {percent(stats['max_decrease_pct'])}")
+        median.metric("Median change", percent(stats['median_pct']))
+
+        search_column, direction_column, threshold_column = st.columns(3)
+        search = search_column.text_input("Reference contains", key="changes_search").strip()
+        direction = direction_column.selectbox(
+            "Direction", [DIRECTION_ALL, DIRECTION_UP, DIRECTION_DOWN], key="changes_direction"
+        )
+        min_change_pct = threshold_column.number_input(
+            "Only changes of at least (%)", min_value=0.0, value=0.0, step=1.0, key="changes_threshold"
+        )
+        sort_column, order_column, size_column = st.columns(3)
+        columns = list(changes.columns)
+        sort_by = sort_column.selectbox(
+            "Sort by", columns, index=columns.index(CHANGE_PCT_COLUMN), key="changes_sort"
+        )
+        descending = order_column.toggle("Descending", value=True, key="changes_descending")
+        page_size = size_column.selectbox("Rows per page", PAGE_SIZES, index=1, key="changes_page_size")
+
+        filters = (search, direction, min_change_pct, sort_by, descending)
+        filtered = cache.get_or_compute(
+            (compared, 'filtered_changes', filters), lambda: self.logic.filter_changes(changes, *filters)
+        )
+        pages = max(1, -(-len(filtered) // page_size))
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="changes_page")
+        first = (min(page, pages) - 1) * page_size
+        st.caption(f"{len(filtered)} of {len(changes)} changes match; rows {min(first + 1, len(filtered))}-"
+                   f"{min(first + page_size, len(filtered))} shown.")
+        st.dataframe(
+            filtered.iloc[first:first + page_size], column_config=PRICE_COLUMN_CONFIG,
+            use_container_width=True, hide_index=True,
+        )
+        self.download_changes(compared, changes, filtered, filters)
+
+    @staticmethod
+    def download_changes(compared, changes, filtered, filters):
+        """
+        Offers every change for download, serialized once per comparison.
+
+        Serializing the filtered view on every filter change would take
+        seconds on large diffs, so it is only exported when asked for.
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+        st.caption(f"Download all {len(changes)} changes")
+        download_buttons(
+            changes, f"price_changes_{today}", cache_key=(compared, "price_changes"),
+            sheet_name="Price Changes", key="price_changes_all",
+        )
+        if len(filtered) == len(changes):
+            return
+        requested = st.session_state.get("price_changes_export") == (compared, filters)
+        if not requested and st.button(f"Prepare the download of the {len(filtered)} filtered changes"):
+            st.session_state["price_changes_export"] = (compared, filters)
+            requested = True
+        if requested:
+            st.caption(f"Download the {len(filtered)} filtered changes")
+            download_buttons(
+                filtered, f"price_changes_filtered_{today}", cache_key=(compared, "price_changes", filters),
+                sheet_name="Price Changes", key="price_changes_filtered",
+            )
+
+    def apply_changes(self, compared):
+        """Dry-runs the price changes against the admin, then applies those the dry run confirmed."""
+        with st.expander("Apply the price changes to the admin"):
+            username = st.text_input("Admin username", key="push_username")
+            password = st.text_input("Admin password", type="password", key="push_password")
+            price_field = st.text_input(
+                "Price field of the product form (name or id)", value=DEFAULT_PRICE_FIELD, key="push_price_field"
+            )
+            concurrency = st.slider(
+                "Parallel workers", min_value=1, max_value=MAX_CONCURRENCY, value=DEFAULT_CONCURRENCY,
+                key="push_concurrency",
+            )
+            # A missing or unparseable price ("N/C", empty) cannot be checked nor pushed
+            pushable = self.logic.price_changes.dropna(subset=['Old Price', 'New Price'])
+            changes = [(str(reference), old, new) for reference, old, new in pushable.itertuples(index=False)]
+            if len(pushable) < len(self.logic.price_changes):
+                st.caption(
+                    f"{len(self.logic.price_changes) - len(pushable)} changes without an old or new price "
+                    "are left out."
+                )
+
+            # The dry run of this comparison, whose confirmed references can be applied
+            dry_run = None
+            dry_run_entry = st.session_state.get("price_push_dry_run")
+            if dry_run_entry and dry_run_entry[0] == compared:
+                dry_run = get_job_runner().get(dry_run_entry[1])
+            confirmed = []
+            if dry_run is not None and dry_run.status == JOB_DONE and dry_run.result and dry_run.result["results"]:
+                confirmed = [
+                    change for change in changes
+                    if dry_run.result["results"].get(change[0], {}).get("status") == STATUS_WOULD_UPDATE
+                ]
+
+            dry_run_column, apply_column = st.columns(2)
+            if dry_run_column.button("Dry run", disabled=not changes):
+                if username and password:
+                    job = self.start_push(username, password, price_field, concurrency, changes, dry_run=True)
+                    st.session_state["price_push_dry_run"] = (compared, job.id)
+                else:
+                    st.warning("Please fill out your username and password.")
+            if apply_column.button(f"Apply {len(confirmed)} confirmed changes", disabled=not confirmed):
+                if username and password:
+                    self.start_push(username, password, price_field, concurrency, confirmed, dry_run=False)
+                else:
+                    st.warning("Please fill out your username and password.")
+            st.caption(
+                "The dry run checks that each product still shows the old price; only those are applied, "
+                "and each stored price is read back afterwards."
+            )
+
+        job = current_job("price_push")
+        if job is not None:
+            self.show_push(job)
+
+    def start_push(self, username, password, price_field, concurrency, changes, dry_run=True):
+        """Submits a price push (or its dry run) as a background job and selects it in the URL."""
+        pusher = PricePusher(
+            username, password, session_cache=SessionCache(), price_field=price_field, concurrency=concurrency,
+            journal=get_journal(), product_index=get_product_index(),
+        )
+
+        async def run_job(job):
+            try:
+                # Index the product ids of the brands scraped since the last run
+                await asyncio.to_thread(pusher.product_index.refresh, SnapshotStore())
+                results = await asyncio.to_thread(
+                    pusher.run, changes, dry_run,
+                    lambda reference, status: job.record(reference, status, status in OK_STATUSES),
+                )
+            finally:
+                pusher.close()
+            job.timings = pusher.timer
+            return {"dry_run": dry_run, "results": results}
+
+        label = f"{'Dry run' if dry_run else 'Price update'} of {len(changes)} references"
+        job = get_job_runner().submit("price_push", label, run_job, total=len(changes), unit="references")
+        st.query_params[JOB_QUERY_PARAM] = job.id
+        return job
+
+    @staticmethod
+    def show_push(job):
+        """Follows a price push job and shows its per-reference results once it has finished."""
+        job = follow_job(job)
+        if job is None or job.status != JOB_DONE:
+            return
+        results = job.result["results"]
+        if results is None:
+            st.error("Login failed. Please check your credentials.")
+            return
+        df = pd.DataFrame([
+            {"Reference": reference, "Status": result["status"], "Admin price": result["admin_price"],
+             "Old Price": result["old_price"], "New Price": result["new_price"]}
+            for reference, result in results.items()
+        ])
+        counts = df["Status"].value_counts()
+        st.write(
+            ("Dry run: " if job.result["dry_run"] else "Price update: ")
+            + ", ".join(f"{status} {count}" for status, count in counts.items())
+        )
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
 
 if __name__ == "__main__":
-    app_ui = PriceUpdateAppUI()
-    app_ui.run()
+    with page_load_timer("Price Update"):
+        app_ui = PriceUpdateAppUI()
+        app_ui.run()
@@ -0,0 +1,46 @@
+"""Regression tests of the HTTP listing scraper against the mock admin."""
+import unittest
+from unittest import mock
+from urllib.parse import urljoin
+
+from benchmarks.mock_admin import MockAdminServer
+from utils import http_scraper
+from utils.http_scraper import HttpListingScraper
+
+
+class ScrapeMarqueTest(unittest.TestCase):
+    def scrape(self, marque, **server_options):
+        with MockAdminServer(products=600, marques=5, page_size=50, **server_options) as server:
+            urls = {
+                name: urljoin(server.base_url, page)
+                for name, page in (
+                    ("ADMIN_DEFAULT_URL", "default.asp"), ("LOGIN_PAGE_URL", "logon.asp"),
+                    ("PRODUCT_SEARCH_URL", "SA_prod.asp"),
+                )
+            }
+            # The page number is found in both cases, so the pages are fetched concurrently
+            no_fallback = mock.patch.object(
+                HttpListingScraper, "_follow_next_links", side_effect=AssertionError("fell back to Suiv. links")
+            )
+            with mock.patch.multiple(http_scraper, **urls), no_fallback:
+                scraper = HttpListingScraper("user", "password")
+                try:
+                    records = scraper.scrape_marque(marque)
+                finally:
+                    scraper.close()
+            expected = {product["reference"] for product in server.catalog.search(marque)}
+        return records, expected
+
+    def test_marque_names(self):
+        records, expected = self.scrape("Marque 2")
+        self.assertEqual([record["Référence"] for record in records], sorted(expected))
+
+    def test_marque_id_equal_to_the_second_page(self):
+        # The marque option value "2" must not be taken for the page number
+        records, expected = self.scrape("Marque 2", marque_ids=True)
+        self.assertEqual(len(records), len(expected))
+        self.assertEqual({record["Référence"] for record in records}, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
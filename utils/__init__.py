@@ -0,0 +1 @@
+"""Shared helpers for the RestauConcept admin tool pages."""
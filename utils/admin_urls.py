@@ -0,0 +1,16 @@
+"""URLs of the RestauConcept admin back office."""
+import os
+from urllib.parse import urljoin
+
+# Root of the admin back office; override with RESTAUCONCEPT_ADMIN_URL (e.g. a local mock server)
+ADMIN_BASE_URL = os.environ.get("RESTAUCONCEPT_ADMIN_URL", "https://www.restoconcept.com/admin/").rstrip("/") + "/"
+
+LOGIN_PAGE_URL = urljoin(ADMIN_BASE_URL, "logon.asp")
+ADMIN_DEFAULT_URL = urljoin(ADMIN_BASE_URL, "default.asp")
+PRODUCT_SEARCH_URL = urljoin(ADMIN_BASE_URL, "SA_prod.asp")
+PRODUCT_EDIT_URL = urljoin(ADMIN_BASE_URL, "SA_prodEdit.asp")
+
+
+def product_edit_url(product_id):
+    """Returns the URL of the edit page of an admin product id."""
+    return f"{PRODUCT_EDIT_URL}?idProduct={product_id}"
@@ -0,0 +1,141 @@
+"""Shared Chromium launch layer with a lean, resource-blocking browser profile."""
+import logging
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from utils.admin_urls import ADMIN_DEFAULT_URL
+
+logger = logging.getLogger(__name__)
+
+# Requests aborted by the lean profile
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+_ADMIN_HOST = urlsplit(ADMIN_DEFAULT_URL).hostname
+# Registrable domain of the admin, or the host itself for an IP address (local mock server)
+FIRST_PARTY_DOMAIN = (
+    _ADMIN_HOST if _ADMIN_HOST.replace(".", "").isdigit() else ".".join(_ADMIN_HOST.split(".")[-2:])
+)
+
+# Per-job history of finished runs, used to report the savings of the lean profile
+_RUN_HISTORY = {}
+
+
+class RunStats:
+    """Bandwidth and wall-clock statistics of one browser run."""
+
+    def __init__(self, job, lean):
+        self.job = job
+        self.lean = lean
+        self.started_at = time.perf_counter()
+        self.elapsed = None
+        self.requests = 0
+        self.bytes_received = 0
+        self.blocked = {}
+        self.units = 0
+
+    @property
+    def blocked_total(self):
+        return sum(self.blocked.values())
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started_at
+        _RUN_HISTORY.setdefault((self.job, self.lean), []).append(self)
+
+    def per_unit(self):
+        """Returns (bytes, seconds) per processed unit (reference or result page)."""
+        units = max(self.units, 1)
+        return self.bytes_received / units, (self.elapsed or 0) / units
+
+    def savings(self):
+        """
+        Compares this lean run with the previous full-profile runs of the same job.
+
+        Returns:
+            tuple: (bytes saved, seconds saved) per unit, or None without a baseline.
+        """
+        baseline = _RUN_HISTORY.get((self.job, False))
+        if not self.lean or not baseline:
+            return None
+        base_bytes = sum(run.per_unit()[0] for run in baseline) / len(baseline)
+        base_seconds = sum(run.per_unit()[1] for run in baseline) / len(baseline)
+        lean_bytes, lean_seconds = self.per_unit()
+        return base_bytes - lean_bytes, base_seconds - lean_seconds
+
+    def summary(self):
+        """Returns a one-paragraph, human-readable summary of the run."""
+        profile = "lean" if self.lean else "full"
+        text = (
+            f"Browser profile: {profile}. {self.requests} requests, "
+            f"{self.bytes_received / 1024:.0f} KB downloaded, {self.blocked_total} blocked, "
+            f"{self.elapsed or 0:.1f} s."
+        )
+        if self.blocked:
+            text += " Blocked: " + ", ".join(f"{kind} {count}" for kind, count in sorted(self.blocked.items())) + "."
+        savings = self.savings()
+        if savings:
+            saved_bytes, saved_seconds = savings
+            text += (
+                f" Versus the full profile: {saved_bytes / 1024:.0f} KB and {saved_seconds:.2f} s saved per item."
+            )
+        return text
+
+
+class BrowserSession:
+    """A launched Chromium whose contexts share the browser profile and the run statistics."""
+
+    def __init__(self, browser, stats, lean=True):
+        self.browser = browser
+        self.stats = stats
+        self.lean = lean
+        # Load state awaited after navigations; the lean profile then waits for specific selectors
+        self.wait_until = "domcontentloaded" if lean else "networkidle"
+
+    async def new_context(self, **kwargs):
+        """Creates a context, blocking heavy and third-party requests in the lean profile."""
+        context = await self.browser.new_context(**kwargs)
+        if self.lean:
+            await context.route("**/*", self._route)
+        context.on("response", self._on_response)
+        return context
+
+    async def _route(self, route):
+        request = route.request
+        host = urlsplit(request.url).hostname or ""
+        if request.resource_type in BLOCKED_RESOURCE_TYPES:
+            kind = request.resource_type
+        elif host and not (host == FIRST_PARTY_DOMAIN or host.endswith("." + FIRST_PARTY_DOMAIN)):
+            kind = "third-party"
+        else:
+            await route.continue_()
+            return
+        self.stats.blocked[kind] = self.stats.blocked.get(kind, 0) + 1
+        await route.abort()
+
+    def _on_response(self, response):
+        self.stats.requests += 1
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.stats.bytes_received += int(length)
+
+
+@asynccontextmanager
+async def launch_browser(job, headless=True, lean=True):
+    """
+    Launches Chromium for one run and yields a BrowserSession.
+
+    Args:
+        job: Name of the automation, used to compare runs of the same kind.
+        headless: Whether to hide the browser window.
+        lean: Block images, fonts, media and third-party requests (default).
+    """
+    from playwright.async_api import async_playwright
+
+    stats = RunStats(job, lean)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        try:
+            yield BrowserSession(browser, stats, lean)
+        finally:
+            await browser.close()
+            stats.finish()
+            logger.info(stats.summary())
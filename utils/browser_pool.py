@@ -0,0 +1,213 @@
+"""Process-wide pool of Chromium browsers shared by every Streamlit session."""
+import asyncio
+import atexit
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+from utils.browser import BrowserSession, RunStats, launch_browser
+
+logger = logging.getLogger(__name__)
+
+MAX_BROWSERS = 2
+MAX_CONTEXTS = 8
+MAX_JOBS_PER_BROWSER = 50
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class _PooledBrowser:
+    """A pooled Chromium with its job counters."""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.active_jobs = 0
+        self.jobs_served = 0
+        self.crashed = False
+        browser.on("disconnected", self._on_disconnected)
+
+    def _on_disconnected(self, _):
+        self.crashed = True
+
+    @property
+    def usable(self):
+        return not self.crashed and self.browser.is_connected()
+
+
+class PooledBrowserSession(BrowserSession):
+    """BrowserSession on a pooled browser, limited to the contexts reserved for the job."""
+
+    def __init__(self, browser, stats, lean, max_contexts):
+        super().__init__(browser, stats, lean)
+        self.max_contexts = max_contexts
+        self.contexts = []
+
+    async def new_context(self, **kwargs):
+        if len(self.contexts) >= self.max_contexts:
+            raise RuntimeError(f"Job reserved {self.max_contexts} browser contexts and they are all open.")
+        context = await super().new_context(**kwargs)
+        self.contexts.append(context)
+        context.on("close", lambda _: self.contexts.remove(context) if context in self.contexts else None)
+        return context
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium browsers running on a dedicated background event loop.
+
+    Jobs get isolated contexts on the least busy browser. The pool caps the
+    number of serving browsers and of open contexts across all jobs, and
+    retires a browser after `max_jobs_per_browser` jobs or when it crashes.
+    """
+
+    def __init__(self, max_browsers=MAX_BROWSERS, max_contexts=MAX_CONTEXTS,
+                 max_jobs_per_browser=MAX_JOBS_PER_BROWSER, headless=True):
+        self.max_browsers = max_browsers
+        self.max_contexts = max_contexts
+        self.max_jobs_per_browser = max_jobs_per_browser
+        self.headless = headless
+        self._playwright = None
+        self._browsers = []
+        self._reserved_contexts = 0
+        self._context_slots = asyncio.Semaphore(max_contexts)
+        self._reserve_lock = asyncio.Lock()
+        self._browser_lock = asyncio.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+
+    def run(self, coro):
+        """Runs a coroutine on the pool's event loop and blocks until it returns."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def submit(self, coro):
+        """Schedules a coroutine on the pool's event loop and returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def status(self):
+        """Returns the number of serving browsers, running jobs and reserved context slots."""
+        return {
+            "browsers": len(self._browsers),
+            "active_jobs": sum(pooled.active_jobs for pooled in self._browsers),
+            "reserved_contexts": self._reserved_contexts,
+        }
+
+    @asynccontextmanager
+    async def session(self, job, lean=True, contexts=1):
+        """
+        Yields a BrowserSession on a pooled browser for one job.
+
+        Must be used on the pool's event loop. `contexts` slots are reserved
+        up front so that concurrent jobs cannot starve each other; contexts
+        left open by the job are closed when it ends.
+        """
+        contexts = max(1, min(contexts, self.max_contexts))
+        async with self._reserve_lock:
+            for _ in range(contexts):
+                await self._context_slots.acquire()
+        self._reserved_contexts += contexts
+        pooled = None
+        try:
+            pooled = await self._acquire_browser()
+            stats = RunStats(job, lean)
+            browser_session = PooledBrowserSession(pooled.browser, stats, lean, contexts)
+            try:
+                yield browser_session
+            finally:
+                for context in list(browser_session.contexts):
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning(f"Error closing pooled context: {e}")
+                stats.finish()
+                logger.info(stats.summary())
+        finally:
+            if pooled is not None:
+                await self._release_browser(pooled)
+            self._reserved_contexts -= contexts
+            for _ in range(contexts):
+                self._context_slots.release()
+
+    async def _acquire_browser(self):
+        async with self._browser_lock:
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+
+                self._playwright = await async_playwright().start()
+
+            for pooled in list(self._browsers):
+                if not pooled.usable:
+                    logger.warning("Discarding crashed pooled browser.")
+                    self._browsers.remove(pooled)
+
+            candidates = [pooled for pooled in self._browsers if pooled.jobs_served < self.max_jobs_per_browser]
+            all_busy = all(pooled.active_jobs > 0 for pooled in candidates)
+            if all_busy and len(candidates) < self.max_browsers:
+                logger.info("Launching pooled browser...")
+                pooled = _PooledBrowser(await self._playwright.chromium.launch(headless=self.headless))
+                self._browsers.append(pooled)
+                candidates.append(pooled)
+
+            pooled = min(candidates, key=lambda candidate: candidate.active_jobs)
+            pooled.active_jobs += 1
+            pooled.jobs_served += 1
+            if pooled.jobs_served >= self.max_jobs_per_browser:
+                # Retire: no new jobs, closed once its running jobs are done
+                self._browsers.remove(pooled)
+            return pooled
+
+    async def _release_browser(self, pooled):
+        async with self._browser_lock:
+            pooled.active_jobs -= 1
+            retired = pooled not in self._browsers or not pooled.usable
+            if retired and pooled.active_jobs == 0:
+                if pooled in self._browsers:
+                    self._browsers.remove(pooled)
+                logger.info(f"Recycling pooled browser after {pooled.jobs_served} jobs.")
+                try:
+                    await pooled.browser.close()
+                except Exception as e:
+                    logger.warning(f"Error closing pooled browser: {e}")
+
+    async def _shutdown(self):
+        async with self._browser_lock:
+            for pooled in self._browsers:
+                try:
+                    await pooled.browser.close()
+                except Exception:
+                    pass
+            self._browsers = []
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    def close(self):
+        """Closes every browser, stops Playwright and the background loop."""
+        try:
+            self.run(self._shutdown())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+
+def get_browser_pool():
+    """Returns the process-wide BrowserPool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def open_browser_session(job, browser_pool=None, headless=True, lean=True, contexts=1):
+    """
+    Returns the async context manager yielding a BrowserSession for a job.
+
+    Headless jobs use the pool when one is given; visible browsers are always
+    launched for the job alone.
+    """
+    if browser_pool is not None and headless:
+        return browser_pool.session(job, lean=lean, contexts=contexts)
+    return launch_browser(job, headless=headless, lean=lean)
@@ -0,0 +1,152 @@
+"""Column-pruned loading of Reference / Price catalogs from xlsx, CSV or Parquet files."""
+import csv
+import os
+
+import pandas as pd
+
+# Accepted header names, in order of preference (matched case-insensitively)
+REFERENCE_ALIASES = ("Reference", "Référence", "Ref", "Réf")
+PRICE_ALIASES = ("Price", "Prix public", "Prix")
+SUPPORTED_TYPES = ["xlsx", "csv", "parquet"]
+
+
+def _file_type(source, name=None):
+    name = name or getattr(source, "name", None) or (source if isinstance(source, (str, os.PathLike)) else "")
+    extension = os.path.splitext(str(name))[1].lower().lstrip(".")
+    if extension in ("xlsx", "xlsm"):
+        return "xlsx"
+    if extension in ("csv", "txt"):
+        return "csv"
+    if extension in ("parquet", "pq"):
+        return "parquet"
+    raise ValueError(f"Unsupported catalog file type: {name!r} (expected one of {', '.join(SUPPORTED_TYPES)})")
+
+
+def _rewind(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def resolve_column(columns, requested, aliases):
+    """Returns the header in `columns` matching `requested`, or the first matching alias."""
+    normalized = {str(column).strip().lower(): column for column in columns if column is not None}
+    for candidate in ([requested] if requested else aliases):
+        match = normalized.get(str(candidate).strip().lower())
+        if match is not None:
+            return match
+    wanted = requested or " / ".join(aliases)
+    available = ", ".join(str(column) for column in columns if column is not None)
+    raise ValueError(f"Column {wanted!r} not found. Available columns: {available}")
+
+
+def list_sheets(source, name=None):
+    """Returns the sheet names of an xlsx file, or an empty list for other formats."""
+    if _file_type(source, name) != "xlsx":
+        return []
+    from openpyxl import load_workbook
+
+    _rewind(source)
+    workbook = load_workbook(source, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+        _rewind(source)
+
+
+def list_columns(source, name=None, sheet_name=None):
+    """Returns the header row of a catalog file."""
+    file_type = _file_type(source, name)
+    _rewind(source)
+    try:
+        if file_type == "xlsx":
+            from openpyxl import load_workbook
+
+            workbook = load_workbook(source, read_only=True)
+            try:
+                sheet = workbook[sheet_name] if sheet_name else workbook.active
+                return list(next(sheet.iter_rows(max_row=1, values_only=True), ()))
+            finally:
+                workbook.close()
+        if file_type == "csv":
+            return list(pd.read_csv(source, nrows=0, sep=_sniff_separator(source)).columns)
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(source).names
+    finally:
+        _rewind(source)
+
+
+def _sniff_separator(source):
+    """Guesses the CSV separator from the first few KB, defaulting to a comma."""
+    _rewind(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            sample = f.read(65536)
+    else:
+        sample = source.read(65536)
+        _rewind(source)
+    if isinstance(sample, bytes):
+        sample = sample.decode("utf-8", errors="ignore")
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return ","
+
+
+def load_catalog(source, name=None, sheet_name=None, reference_column=None, price_column=None):
+    """
+    Loads only the reference and price columns of a catalog.
+
+    xlsx workbooks are streamed in read-only mode over the columns between the
+    two wanted ones; CSV and Parquet files are read with column selection.
+
+    Args:
+        source: Path or file-like object (e.g. a Streamlit upload).
+        name: File name used to detect the format when `source` has none.
+        sheet_name: Worksheet to read, defaults to the active sheet.
+        reference_column: Header of the reference column, defaults to REFERENCE_ALIASES.
+        price_column: Header of the price column, defaults to PRICE_ALIASES.
+
+    Returns:
+        DataFrame: Columns `Reference` and `Price`, raw values as found in the file.
+    """
+    file_type = _file_type(source, name)
+    headers = list_columns(source, name, sheet_name)
+    reference = resolve_column(headers, reference_column, REFERENCE_ALIASES)
+    price = resolve_column(headers, price_column, PRICE_ALIASES)
+
+    _rewind(source)
+    if file_type == "xlsx":
+        df = _load_xlsx(source, sheet_name, headers.index(reference), headers.index(price))
+    elif file_type == "csv":
+        # As text, like the cells of a workbook: "00123" stays a reference, not the number 123
+        df = pd.read_csv(
+            source, usecols=[reference, price], sep=_sniff_separator(source), dtype={reference: str, price: str},
+        )
+        df = df.rename(columns={reference: "Reference", price: "Price"})
+    else:
+        df = pd.read_parquet(source, columns=[reference, price])
+        df = df.rename(columns={reference: "Reference", price: "Price"})
+    _rewind(source)
+
+    df = df[["Reference", "Price"]]
+    return df[df["Reference"].notna()].reset_index(drop=True)
+
+
+def _load_xlsx(source, sheet_name, reference_index, price_index):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.active
+        first = min(reference_index, price_index)
+        last = max(reference_index, price_index)
+        references, prices = [], []
+        for row in sheet.iter_rows(min_row=2, min_col=first + 1, max_col=last + 1, values_only=True):
+            references.append(row[reference_index - first] if len(row) > reference_index - first else None)
+            prices.append(row[price_index - first] if len(row) > price_index - first else None)
+    finally:
+        workbook.close()
+    return pd.DataFrame({"Reference": references, "Price": prices})
+
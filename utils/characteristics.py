@@ -0,0 +1,148 @@
+"""Long-format product characteristics extracted from PDF catalogs, and an index across catalogs."""
+import logging
+import threading
+
+from utils.paths import DATA_DIR, slug
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = DATA_DIR / "characteristics"
+CATALOG_COLUMN = "catalog"
+PRODUCT_COLUMN = "product"
+CHARACTERISTIC_COLUMN = "characteristic"
+VALUE_COLUMN = "value"
+COLUMNS = [CATALOG_COLUMN, PRODUCT_COLUMN, CHARACTERISTIC_COLUMN, VALUE_COLUMN]
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def characteristics_frame(products, catalog=""):
+    """
+    Flattens PDFExtractor.products into one (catalog, product, characteristic, value) row per value.
+
+    Every column is categorical: product and characteristic names repeat on
+    many rows, and so do values such as "230 V" or "Inox". The label column
+    of each table (whose values are the characteristic names) is dropped.
+    """
+    # Imported here: the PDF page imports this module on every load, but only an extraction needs pandas
+    import pandas as pd
+
+    rows = [
+        (product.strip(), characteristic, value)
+        for product, characteristics in products.items()
+        if any(characteristic != value for characteristic, value in characteristics.items())
+        for characteristic, value in characteristics.items()
+    ]
+    frame = pd.DataFrame(rows, columns=COLUMNS[1:])
+    frame.insert(0, CATALOG_COLUMN, catalog)
+    return frame.astype("category")
+
+
+class CharacteristicsIndex:
+    """
+    Keeps the characteristics of every ingested catalog, one Parquet file per catalog.
+
+    All catalogs are loaded into a single categorical frame on first use,
+    with the row positions of each product and characteristic precomputed,
+    so lookups do not scan the frame.
+    """
+
+    def __init__(self, root=DEFAULT_INDEX_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._frame = None
+        self._by_product = {}
+        self._by_characteristic = {}
+
+    def _path(self, catalog):
+        return self.root / f"{slug(catalog)}.parquet"
+
+    def add(self, catalog, frame):
+        """Stores (or replaces) the characteristics of a catalog."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        frame = frame.assign(**{CATALOG_COLUMN: catalog}).astype("category")
+        path = self._path(catalog)
+        tmp_path = path.with_suffix(".tmp")
+        table = pa.Table.from_pandas(frame[COLUMNS], preserve_index=False)
+        pq.write_table(table.replace_schema_metadata({"catalog": catalog}), tmp_path, compression="zstd")
+        tmp_path.replace(path)
+        with self._lock:
+            self._frame = None
+        logger.info(f"Indexed {len(frame)} characteristics of catalog {catalog}.")
+
+    def remove(self, catalog):
+        self._path(catalog).unlink(missing_ok=True)
+        with self._lock:
+            self._frame = None
+
+    def catalogs(self):
+        if not self.root.exists():
+            return []
+        import pyarrow.parquet as pq
+
+        return sorted(
+            pq.read_schema(path).metadata[b"catalog"].decode() for path in self.root.glob("*.parquet")
+        )
+
+    def frame(self):
+        """Returns the characteristics of every catalog as one categorical frame."""
+        import pandas as pd
+        import pyarrow.parquet as pq
+
+        with self._lock:
+            if self._frame is None:
+                paths = sorted(self.root.glob("*.parquet")) if self.root.exists() else []
+                frames = [pq.read_table(path).to_pandas() for path in paths]
+                frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUMNS)
+                # Concatenating frames with different categories falls back to object columns
+                self._frame = frame.astype("category")
+                self._by_product = self._frame.groupby(PRODUCT_COLUMN, observed=True).indices
+                self._by_characteristic = self._frame.groupby(CHARACTERISTIC_COLUMN, observed=True).indices
+            return self._frame
+
+    def products(self):
+        return sorted(self.frame()[PRODUCT_COLUMN].cat.categories)
+
+    def characteristics(self):
+        return sorted(self.frame()[CHARACTERISTIC_COLUMN].cat.categories)
+
+    def search_products(self, text):
+        """Returns the product names containing `text`, case-insensitively."""
+        categories = self.frame()[PRODUCT_COLUMN].cat.categories
+        return sorted(categories[categories.str.contains(text, case=False, regex=False)])
+
+    def lookup(self, products=None, characteristics=None):
+        """Returns the rows of the given products and/or characteristics, across all catalogs."""
+        frame = self.frame()
+        positions = None
+        for names, index in ((products, self._by_product), (characteristics, self._by_characteristic)):
+            if names is None:
+                continue
+            found = set()
+            for name in names:
+                found.update(index.get(name, ()))
+            positions = found if positions is None else positions & found
+        if positions is None:
+            return frame
+        return frame.iloc[sorted(positions)].reset_index(drop=True)
+
+    def compare(self, products=None, characteristics=None):
+        """Returns a characteristic x (catalog, product) table of the selected rows."""
+        rows = self.lookup(products, characteristics).astype(str)
+        return rows.pivot_table(
+            index=CHARACTERISTIC_COLUMN, columns=[CATALOG_COLUMN, PRODUCT_COLUMN], values=VALUE_COLUMN,
+            aggfunc="first",
+        )
+
+
+def get_characteristics_index():
+    """Returns the process-wide CharacteristicsIndex."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CharacteristicsIndex()
+        return _index
@@ -0,0 +1,144 @@
+"""In-memory xlsx / CSV / Parquet exports for the download buttons, written in row chunks."""
+import io
+import math
+
+import streamlit as st
+
+from utils.memo_cache import get_memo_cache
+
+XLSX = "xlsx"
+CSV = "csv"
+PARQUET = "parquet"
+EXPORT_FORMATS = (XLSX, CSV, PARQUET)
+FORMAT_LABELS = {XLSX: "Excel", CSV: "CSV", PARQUET: "Parquet"}
+MIME_TYPES = {
+    XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    CSV: "text/csv",
+    PARQUET: "application/vnd.apache.parquet",
+}
+# Rows converted and written at a time
+CHUNK_ROWS = 50_000
+
+
+def _chunks(frame, chunk_rows=CHUNK_ROWS):
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def _cell(value, pd):
+    """Converts a DataFrame value to one openpyxl can write (missing values become empty cells)."""
+    if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.tz_localize(None).to_pydatetime() if value.tzinfo else value.to_pydatetime()
+    return value
+
+
+def write_xlsx(frame, output, sheet_name="Sheet1", chunk_rows=CHUNK_ROWS):
+    """Writes a DataFrame to a write-only workbook, one chunk of rows at a time."""
+    # Imported here: pages import this module on every load, but only an export needs them
+    import pandas as pd
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append([str(column) for column in frame.columns])
+    for chunk in _chunks(frame, chunk_rows):
+        for row in chunk.itertuples(index=False, name=None):
+            sheet.append([_cell(value, pd) for value in row])
+    workbook.save(output)
+
+
+def write_csv(frame, output, chunk_rows=CHUNK_ROWS):
+    """Writes a DataFrame as UTF-8 CSV to a binary stream, one chunk of rows at a time."""
+    if frame.empty:
+        output.write(frame.to_csv(index=False).encode("utf-8"))
+        return
+    for index, chunk in enumerate(_chunks(frame, chunk_rows)):
+        output.write(chunk.to_csv(index=False, header=index == 0).encode("utf-8"))
+
+
+def write_parquet(frame, output, chunk_rows=CHUNK_ROWS):
+    """Writes a DataFrame as zstd-compressed Parquet, one row group per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    with pq.ParquetWriter(output, schema, compression="zstd") as writer:
+        if frame.empty:
+            writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+        for chunk in _chunks(frame, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def export_frame(frame, file_format, sheet_name="Sheet1"):
+    """
+    Serializes a DataFrame in memory.
+
+    Returns:
+        BytesIO: The xlsx, CSV or Parquet file, handed to st.download_button without copying it to bytes.
+    """
+    output = io.BytesIO()
+    if file_format == XLSX:
+        write_xlsx(frame, output, sheet_name)
+    elif file_format == CSV:
+        write_csv(frame, output)
+    elif file_format == PARQUET:
+        write_parquet(frame, output)
+    else:
+        raise ValueError(f"Unsupported export format: {file_format!r}")
+    return output
+
+
+class TablesWorkbook:
+    """Writes extracted tables one below the other into a write-only workbook, a blank row between them."""
+
+    def __init__(self, output, sheet_name="Extracted Data"):
+        from openpyxl import Workbook
+
+        self.output = output
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_name)
+        self.table_count = 0
+
+    def write_table(self, table):
+        if self.table_count:
+            self.sheet.append([])  # Add space between tables
+        for row in table:
+            self.sheet.append(row)
+        self.table_count += 1
+
+    def close(self):
+        self.workbook.save(self.output)
+
+
+def export_tables(tables, sheet_name="Extracted Data"):
+    """Returns the xlsx file (a BytesIO) of tables (lists of rows) laid out one below the other."""
+    output = io.BytesIO()
+    workbook = TablesWorkbook(output, sheet_name)
+    for table in tables:
+        workbook.write_table(table)
+    workbook.close()
+    return output
+
+
+def download_buttons(frame, base_name, formats=EXPORT_FORMATS, cache_key=None, sheet_name="Sheet1", key=None):
+    """
+    Shows one download button per format, side by side.
+
+    With a `cache_key` identifying the content of `frame`, the files are
+    kept in the MemoCache instead of being serialized again on every rerun.
+    """
+    cache = get_memo_cache()
+    for column, file_format in zip(st.columns(len(formats)), formats):
+        if cache_key is None:
+            data = export_frame(frame, file_format, sheet_name)
+        else:
+            data = cache.get_or_compute(
+                ("export", cache_key, file_format, sheet_name),
+                lambda: export_frame(frame, file_format, sheet_name),
+            )
+        column.download_button(
+            f"Download as {FORMAT_LABELS[file_format]}", data, file_name=f"{base_name}.{file_format}",
+            mime=MIME_TYPES[file_format], key=f"{key or base_name}_{file_format}",
+        )
@@ -0,0 +1,473 @@
+"""Browserless scraping of the SA_prod.asp product listing over plain HTTP."""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from utils.admin_urls import ADMIN_DEFAULT_URL, LOGIN_PAGE_URL, PRODUCT_SEARCH_URL
+from utils.table_extract import LISTING_COLUMNS, rows_to_records
+
+logger = logging.getLogger(__name__)
+
+NEXT_PAGE_TEXT = "Suiv."
+DEFAULT_WORKERS = 4
+REQUEST_TIMEOUT = 30
+FORM_URLENCODED = "application/x-www-form-urlencoded"
+FORM_MULTIPART = "multipart/form-data"
+
+
+class AdminPageParser(HTMLParser):
+    """
+    Single-pass parser for admin pages.
+
+    Collects the forms (with their fields, selects and buttons), the links and
+    the cell texts of every row of `table.<table_class>`, with the links of
+    each row in `row_links` (aligned with `rows`). Form controls are kept as
+    a browser would submit them: disabled controls and file inputs are left
+    out, and every selected option of a `<select multiple>` is kept.
+    """
+
+    def __init__(self, table_class="listTable"):
+        super().__init__(convert_charrefs=True)
+        self.table_class = table_class
+        self.forms = []
+        self.links = []
+        self.rows = []
+        self.row_links = []
+        self._form = None
+        self._select = None
+        self._option = None
+        self._textarea = None
+        self._button = None
+        self._link = None
+        self._table_depth = 0
+        self._listing_depth = None
+        self._row = None
+        self._row_link_list = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form":
+            self._form = {
+                "action": attrs.get("action") or "",
+                "method": (attrs.get("method") or "get").lower(),
+                "enctype": (attrs.get("enctype") or FORM_URLENCODED).lower(),
+                "name": attrs.get("name"),
+                "fields": [],
+                "selects": {},
+                "multiple": set(),
+                "ids": {},
+                "buttons": [],
+            }
+            self.forms.append(self._form)
+        elif tag == "input" and self._form is not None:
+            self._handle_input(attrs)
+        elif tag == "select" and self._form is not None:
+            self._select = attrs.get("name") if "disabled" not in attrs else None
+            if self._select:
+                self._form["selects"][self._select] = []
+                if "multiple" in attrs:
+                    self._form["multiple"].add(self._select)
+                self._register_id(attrs)
+        elif tag == "option" and self._select:
+            self._end_option()  # </option> is often omitted
+            if "disabled" not in attrs:
+                self._option = {"value": attrs.get("value"), "selected": "selected" in attrs, "text": []}
+        elif tag == "textarea" and self._form is not None and attrs.get("name") and "disabled" not in attrs:
+            self._textarea = (attrs["name"], [])
+            self._register_id(attrs)
+        elif tag == "button" and self._form is not None and "disabled" not in attrs:
+            self._button = {"name": attrs.get("name"), "value": attrs.get("value", ""), "text": []}
+        elif tag == "a":
+            self._link = {"href": attrs.get("href"), "text": []}
+        elif tag == "table":
+            self._table_depth += 1
+            classes = (attrs.get("class") or "").split()
+            if self._listing_depth is None and self.table_class in classes:
+                self._listing_depth = self._table_depth
+        elif tag == "tr" and self._table_depth == self._listing_depth:
+            self._end_row()
+            self._row = []
+            self._row_link_list = []
+        elif tag in ("td", "th") and self._row is not None and self._table_depth == self._listing_depth:
+            self._end_cell()
+            if tag == "td":
+                self._cell = []
+        elif tag == "br" and self._cell is not None:
+            self._cell.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._form = None
+        elif tag == "select":
+            self._end_option()
+            self._select = None
+        elif tag == "option":
+            self._end_option()
+        elif tag == "textarea" and self._textarea:
+            name, text = self._textarea
+            text = "".join(text)
+            # Like a browser, drop the newline that directly follows <textarea>
+            text = text[2:] if text.startswith("\r\n") else text[1:] if text.startswith("\n") else text
+            self._form["fields"].append((name, text))
+            self._textarea = None
+        elif tag == "button" and self._button is not None:
+            self._button["text"] = " ".join("".join(self._button["text"]).split())
+            self._form["buttons"].append(self._button)
+            self._button = None
+        elif tag == "a" and self._link is not None:
+            link = (self._link["href"], " ".join("".join(self._link["text"]).split()))
+            self.links.append(link)
+            if self._row is not None:
+                self._row_link_list.append(link)
+            self._link = None
+        elif tag == "table":
+            if self._table_depth == self._listing_depth:
+                self._end_row()
+                self._listing_depth = None
+            self._table_depth -= 1
+        elif tag == "tr" and self._table_depth == self._listing_depth:
+            self._end_row()
+        elif tag == "td" and self._table_depth == self._listing_depth:
+            self._end_cell()
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+        if self._option is not None:
+            self._option["text"].append(data)
+        if self._textarea is not None:
+            self._textarea[1].append(data)
+        if self._button is not None:
+            self._button["text"].append(data)
+        if self._link is not None:
+            self._link["text"].append(data)
+
+    def _register_id(self, attrs):
+        if attrs.get("id") and attrs.get("name"):
+            self._form["ids"][attrs["id"]] = attrs["name"]
+
+    def _handle_input(self, attrs):
+        name = attrs.get("name")
+        input_type = (attrs.get("type") or "text").lower()
+        self._register_id(attrs)
+        if "disabled" in attrs or input_type == "file":
+            return
+        if input_type in ("submit", "image", "button", "reset"):
+            self._form["buttons"].append({"name": name, "value": attrs.get("value", ""), "text": attrs.get("value", "")})
+        elif name and (input_type not in ("checkbox", "radio") or "checked" in attrs):
+            self._form["fields"].append((name, attrs.get("value", "on" if input_type == "checkbox" else "")))
+
+    def _end_option(self):
+        if self._option is None:
+            return
+        text = " ".join("".join(self._option["text"]).split())
+        value = self._option["value"] if self._option["value"] is not None else text
+        self._form["selects"][self._select].append((value, text, self._option["selected"]))
+        self._option = None
+
+    def _end_cell(self):
+        if self._cell is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+
+    def _end_row(self):
+        self._end_cell()
+        if self._row:
+            self.rows.append(self._row)
+            self.row_links.append(self._row_link_list)
+        self._row = None
+        self._row_link_list = None
+
+
+def parse_page(html):
+    """Parses an admin page and returns the parser holding its forms, links and listing rows."""
+    parser = AdminPageParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+def build_form_request(form, page_url, values, submit_text=None):
+    """
+    Builds the request a browser would send when submitting `form`.
+
+    `values` maps field names (or element ids) to the values to set. Select
+    values may be given as option value or option label. The payload is to
+    be sent with the form's enctype, see HttpListingScraper.submit.
+
+    Returns:
+        tuple: (method, url, payload list)
+    """
+    fields = [(name, value) for name, value in form["fields"]]
+    for name, options in form["selects"].items():
+        selected = [value for value, _, is_selected in options if is_selected]
+        if name in form["multiple"]:
+            fields.extend((name, value) for value in selected)
+        elif selected:
+            # A single select shows the last option marked selected
+            fields.append((name, selected[-1]))
+        elif options:
+            fields.append((name, options[0][0]))
+
+    for key, value in values.items():
+        name = form["ids"].get(key, key)
+        if name in form["selects"]:
+            for option_value, label, _ in form["selects"][name]:
+                if value in (option_value, label):
+                    value = option_value
+                    break
+            else:
+                raise ValueError(f"Option {value!r} not found in select {name!r}")
+        fields = [(field, current) for field, current in fields if field != name]
+        fields.append((name, value))
+
+    for button in form["buttons"]:
+        if button["name"] and (submit_text is None or submit_text in button["text"]):
+            fields.append((button["name"], button["value"]))
+            break
+
+    return form["method"], urljoin(page_url, form["action"] or page_url), fields
+
+
+class HttpListingScraper:
+    """Scrapes the SA_prod.asp listing with a pooled HTTP session instead of a browser."""
+
+    def __init__(
+        self, username, password, session_cache=None, max_workers=DEFAULT_WORKERS, columns=None, pool_size=None
+    ):
+        self.username = username
+        self.password = password
+        self.session_cache = session_cache
+        self.max_workers = max_workers
+        self.columns = columns or LISTING_COLUMNS
+        self.on_page = None
+        self.logged_in = False
+        # Imported here: pages import this module on every load, but only a scrape needs requests
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        # Scraping several marques at once needs max_workers connections for each
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size or max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def get(self, url, **kwargs):
+        response = self.session.get(url, timeout=REQUEST_TIMEOUT, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def submit(self, method, url, payload, enctype=FORM_URLENCODED):
+        """Sends a form payload, as multipart/form-data when that is the form's enctype."""
+        if method == "post" and enctype == FORM_MULTIPART:
+            files = [(name, (None, value)) for name, value in payload]
+            response = self.session.post(url, files=files, timeout=REQUEST_TIMEOUT)
+        elif method == "post":
+            response = self.session.post(url, data=payload, timeout=REQUEST_TIMEOUT)
+        else:
+            response = self.session.get(url, params=payload, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response
+
+    def is_logged_in(self) -> bool:
+        """Checks the current cookies with a single request to the admin home page."""
+        return "logon.asp" not in self.get(ADMIN_DEFAULT_URL).url
+
+    def login(self) -> bool:
+        """Logs in with a cached session when valid, otherwise by posting the logon form."""
+        if self.session_cache is not None:
+            storage_state = self.session_cache.load(self.username)
+            if storage_state:
+                for cookie in storage_state.get("cookies", []):
+                    self.session.cookies.set(
+                        cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/")
+                    )
+                if self.is_logged_in():
+                    logger.info("Reusing cached admin session.")
+                    self.logged_in = True
+                    return True
+                self.session.cookies.clear()
+                self.session_cache.invalidate(self.username)
+
+        logger.info("Logging in over HTTP...")
+        response = self.get(LOGIN_PAGE_URL)
+        page = parse_page(response.text)
+        form = next((f for f in page.forms if "adminuser" in f["ids"]), None)
+        if form is None:
+            logger.error("Login form not found on logon.asp.")
+            return False
+        method, url, payload = build_form_request(
+            form, response.url, {"adminuser": self.username, "adminPass": self.password}
+        )
+        response = self.submit(method, url, payload)
+        if "logon.asp" in response.url or not self.is_logged_in():
+            logger.error("Login failed: admin default page not reachable.")
+            return False
+
+        if self.session_cache is not None:
+            self.session_cache.save(self.username, self._storage_state())
+        self.logged_in = True
+        return True
+
+    def _storage_state(self):
+        """Exports the session cookies in Playwright storage state format."""
+        cookies = [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "expires": cookie.expires if cookie.expires else -1,
+                "httpOnly": False,
+                "secure": bool(cookie.secure),
+                "sameSite": "Lax",
+            }
+            for cookie in self.session.cookies
+        ]
+        return {"cookies": cookies, "origins": []}
+
+    def _fetch_page(self, url):
+        page = parse_page(self.get(url).text)
+        if self.on_page is not None:
+            self.on_page(len(page.rows))
+        return page
+
+    def search_form(self):
+        """Returns (search form, page URL) of SA_prod.asp."""
+        response = self.get(PRODUCT_SEARCH_URL)
+        search_page = parse_page(response.text)
+        form = next((f for f in search_page.forms if "marque" in f["selects"]), None)
+        if form is None:
+            raise RuntimeError("Search form with a marque selector not found on SA_prod.asp.")
+        return form, response.url
+
+    def list_marques(self):
+        """Returns the labels of the marque options of the search form (logging in first if needed)."""
+        if not self.logged_in and not self.login():
+            return None
+        form, _ = self.search_form()
+        return [label for value, label, _ in form["selects"]["marque"] if value and value.strip()]
+
+    def scrape_marque(self, marque, on_page=None):
+        """
+        Returns the listing records of a marque, or None if login failed.
+
+        The first result page is fetched with the search form; once the page
+        count is known from the pagination links, the remaining pages are
+        fetched concurrently. `on_page(row_count)` is called for every page.
+        Once logged in, several marques may be scraped concurrently.
+        """
+        self.on_page = on_page
+        if not self.logged_in and not self.login():
+            return None
+
+        form, search_url = self.search_form()
+        method, url, payload = build_form_request(form, search_url, {"marque": marque}, submit_text="Rechercher")
+        response = self.submit(method, url, payload)
+        first_page = parse_page(response.text)
+        if on_page is not None:
+            on_page(len(first_page.rows))
+
+        pages = {1: first_page}
+        page_key, template = self._page_template(response.url, first_page.links)
+        if page_key is None:
+            self._follow_next_links(response.url, first_page, pages)
+        else:
+            self._fetch_remaining_pages(page_key, template, pages)
+
+        records = []
+        for number in sorted(pages):
+            records.extend(rows_to_records(pages[number].rows, self.columns))
+        logger.info(f"Fetched {len(pages)} result pages over HTTP.")
+        return records
+
+    @staticmethod
+    def _next_href(links):
+        return next((href for href, text in links if href and NEXT_PAGE_TEXT in text), None)
+
+    def _page_template(self, page_url, links):
+        """
+        Finds the query parameter that carries the page number.
+
+        It is the only parameter whose value is 2 in the "Suiv." link and 1 or
+        absent in the URL of the first result page, so that a search
+        parameter that happens to be 2 (e.g. a marque id) is never rewritten.
+
+        Returns:
+            tuple: (parameter name, absolute "Suiv." URL), or (None, None) when
+            the next link does not expose a page number unambiguously.
+        """
+        next_href = self._next_href(links)
+        if not next_href or next_href.lower().startswith("javascript:"):
+            return None, None
+        next_url = urljoin(page_url, next_href)
+        current = dict(parse_qsl(urlsplit(page_url).query, keep_blank_values=True))
+        candidates = {
+            key for key, value in parse_qsl(urlsplit(next_url).query, keep_blank_values=True)
+            if value == "2" and current.get(key, "1") == "1"
+        }
+        if len(candidates) != 1:
+            return None, None
+        page_key = candidates.pop()
+        if self._last_known_page(links, page_key, next_url) < 2:
+            return None, None
+        return page_key, next_url
+
+    @staticmethod
+    def _page_url(template, page_key, number):
+        parts = urlsplit(template)
+        query = [(key, str(number) if key == page_key else value)
+                 for key, value in parse_qsl(parts.query, keep_blank_values=True)]
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    @staticmethod
+    def _last_known_page(links, page_key, template):
+        """Returns the highest page number of the links that only differ from `template` by `page_key`."""
+        parts = urlsplit(template)
+        search = {key: value for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != page_key}
+        numbers = []
+        for href, _ in links:
+            if not href:
+                continue
+            link = urlsplit(urljoin(template, href))
+            if link.path != parts.path:
+                continue
+            query = dict(parse_qsl(link.query, keep_blank_values=True))
+            value = query.pop(page_key, None)
+            if query == search and value and value.isdigit():
+                numbers.append(int(value))
+        return max(numbers, default=0)
+
+    def _fetch_remaining_pages(self, page_key, template, pages):
+        """Fetches every linked result page concurrently, repeating while new pages are revealed."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            last_fetched = 1
+            while True:
+                last_known = self._last_known_page(pages[last_fetched].links, page_key, template)
+                if last_known <= last_fetched:
+                    if self._next_href(pages[last_fetched].links) and last_fetched + 1 not in pages:
+                        last_known = last_fetched + 1
+                    else:
+                        break
+                numbers = [n for n in range(last_fetched + 1, last_known + 1) if n not in pages]
+                urls = [self._page_url(template, page_key, n) for n in numbers]
+                for number, page in zip(numbers, executor.map(self._fetch_page, urls)):
+                    pages[number] = page
+                last_fetched = last_known
+
+    def _follow_next_links(self, page_url, page, pages):
+        """Falls back to following the "Suiv." links one page at a time."""
+        while True:
+            next_href = self._next_href(page.links)
+            if not next_href:
+                return
+            if next_href.lower().startswith("javascript:"):
+                raise RuntimeError("Pagination relies on JavaScript; use the browser engine.")
+            page_url = urljoin(page_url, next_href)
+            page = self._fetch_page(page_url)
+            pages[len(pages) + 1] = page
@@ -0,0 +1,101 @@
+"""Streamlit widgets to follow background jobs."""
+import streamlit as st
+
+from utils.jobs import JOB_FAILED, get_job_runner
+
+REFRESH_SECONDS = 1
+JOB_QUERY_PARAM = "job"
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "—"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def render_progress(job):
+    """Shows the progress bar, throughput, ETA and rolling failure list of a job."""
+    if job.total:
+        st.progress(min(job.done / job.total, 1.0), text=f"{job.label}: {job.done}/{job.total} {job.unit}")
+    else:
+        st.write(f"{job.label}: {job.done} {job.unit}")
+    throughput, eta, failed = st.columns(3)
+    throughput.metric(f"{job.unit.capitalize()} per minute", f"{job.throughput_per_minute():.1f}")
+    eta.metric("ETA", format_duration(job.eta_seconds()))
+    failed.metric("Failed", job.failed)
+    failures = job.recent_failures()
+    if failures:
+        st.caption("Recent failures")
+        st.dataframe(failures, use_container_width=True, hide_index=True)
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def _live_progress(job_id):
+    job = get_job_runner().get(job_id)
+    if job is None:
+        return
+    render_progress(job)
+    if job.finished:
+        st.rerun()
+
+
+def render_timings(job):
+    """Shows the per-step percentiles of a finished job, with the spans and traces for download."""
+    with st.expander("Step timings"):
+        st.dataframe(job.timings.summary(), use_container_width=True, hide_index=True)
+        csv_column, json_column = st.columns(2)
+        csv_column.download_button(
+            "Download spans (CSV)", job.timings.to_csv(), file_name=f"timings_{job.id}.csv", mime="text/csv",
+            key=f"timings_csv_{job.id}",
+        )
+        json_column.download_button(
+            "Download spans (JSON)", job.timings.to_json(), file_name=f"timings_{job.id}.json",
+            mime="application/json", key=f"timings_json_{job.id}",
+        )
+        if job.traces:
+            st.caption("Playwright traces of the slowest items (open with `playwright show-trace <file>`)")
+            for item, path in job.traces.items():
+                if path.exists():
+                    st.download_button(
+                        f"Trace of {item}", path.read_bytes(), file_name=path.name, mime="application/zip",
+                        key=f"trace_{job.id}_{item}",
+                    )
+
+
+def current_job(kind):
+    """
+    Returns the job selected in the URL (so a browser refresh reconnects to
+    it), letting the user pick another job of the same kind in the sidebar.
+    """
+    runner = get_job_runner()
+    jobs = runner.list_jobs(kind)
+    job_id = st.query_params.get(JOB_QUERY_PARAM)
+    if jobs:
+        ids = [job.id for job in jobs]
+        index = ids.index(job_id) if job_id in ids else 0
+        labels = {job.id: f"{job.label} ({job.status}, {job.id})" for job in jobs}
+        job_id = st.sidebar.selectbox("Jobs", ids, index=index, format_func=labels.get)
+        st.query_params[JOB_QUERY_PARAM] = job_id
+    return runner.get(job_id) if job_id else None
+
+
+def follow_job(job):
+    """
+    Renders a job: live progress while it runs, then returns the finished job.
+
+    Returns:
+        Job: The job once it has finished, otherwise None.
+    """
+    if not job.finished:
+        _live_progress(job.id)
+        return None
+    render_progress(job)
+    if job.summary:
+        st.caption(job.summary)
+    if job.timings is not None and job.timings.spans:
+        render_timings(job)
+    if job.status == JOB_FAILED:
+        st.error(f"The job failed: {job.error}")
+    return job
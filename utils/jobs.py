@@ -0,0 +1,140 @@
+"""Background jobs that keep running across Streamlit reruns, with live progress."""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from utils.browser_pool import get_browser_pool
+
+logger = logging.getLogger(__name__)
+
+MAX_RECENT_FAILURES = 50
+MAX_FINISHED_JOBS = 50
+
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+class Job:
+    """Progress and outcome of one background job."""
+
+    def __init__(self, kind, label, total=None, unit="items"):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.failed = 0
+        self.failures = deque(maxlen=MAX_RECENT_FAILURES)
+        self.status = JOB_RUNNING
+        self.result = None
+        self.error = None
+        self.summary = None
+        # utils.timing.StepTimer of the run, and {item: Playwright trace path} of its slowest items
+        self.timings = None
+        self.traces = {}
+        self.started_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.status != JOB_RUNNING
+
+    def record(self, item, status, ok=True):
+        """Records the outcome of one item; failures go to the rolling failure list."""
+        with self._lock:
+            self.done += 1
+            if not ok:
+                self.failed += 1
+                self.failures.append({"Item": item, "Status": status, "At": time.strftime("%H:%M:%S")})
+
+    def advance(self, count=1):
+        """Counts `count` processed items without an individual outcome."""
+        with self._lock:
+            self.done += count
+
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.started_at
+
+    def throughput_per_minute(self):
+        elapsed = self.elapsed()
+        return self.done / elapsed * 60 if elapsed > 0 else 0.0
+
+    def eta_seconds(self):
+        """Returns the estimated remaining time, or None when it cannot be estimated yet."""
+        if not self.total or not self.done or self.finished:
+            return None
+        return (self.total - self.done) / (self.done / self.elapsed())
+
+    def recent_failures(self):
+        with self._lock:
+            return list(reversed(self.failures))
+
+
+class JobRunner:
+    """Runs job coroutines on the browser pool's background event loop and tracks them by id."""
+
+    def __init__(self, browser_pool=None):
+        self.browser_pool = browser_pool or get_browser_pool()
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, label, coro_factory, total=None, unit="items"):
+        """
+        Starts a job in the background and returns it immediately.
+
+        Args:
+            kind: Job family, e.g. "deactivation" or "scraping".
+            label: Short description shown in the UI.
+            coro_factory: Called with the Job, returns the coroutine to run.
+            total: Number of items, when known up front.
+            unit: Name of the items, for throughput display.
+        """
+        job = Job(kind, label, total, unit)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self.browser_pool.submit(self._run(job, coro_factory(job)))
+        return job
+
+    async def _run(self, job, coro):
+        try:
+            job.result = await coro
+            job.status = JOB_DONE
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, kind=None):
+        """Returns the jobs of a kind, most recent first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in reversed(jobs) if kind is None or job.kind == kind]
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+def get_job_runner():
+    """Returns the process-wide JobRunner."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
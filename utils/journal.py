@@ -0,0 +1,109 @@
+"""Durable per-reference outcome journal for bulk admin actions."""
+import logging
+import sqlite3
+import threading
+import time
+
+from utils.paths import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = DATA_DIR / "journal.sqlite3"
+
+_journal = None
+_journal_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outcomes (
+    action TEXT NOT NULL,
+    reference TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (action, reference)
+)
+"""
+
+
+class Journal:
+    """
+    SQLite journal of the latest outcome of each (action, reference).
+
+    Outcomes are committed as they complete, so an interrupted run can be
+    resumed without repeating the references it already handled. Lookups
+    can be limited to recent outcomes with `max_age`, and `clear` drops
+    outcomes that should no longer be taken into account.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+
+    def record(self, action, reference, status, attempts=1):
+        """Stores the outcome of one reference, replacing any previous one."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outcomes (action, reference, status, attempts, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (action, reference, status, attempts, time.time()),
+            )
+
+    def statuses(self, action, references=None, max_age=None):
+        """
+        Returns the latest status of references for an action.
+
+        Args:
+            max_age: Only outcomes recorded in the last `max_age` seconds, when given.
+
+        Returns:
+            dict: Reference -> status, for the journaled references only.
+        """
+        since = time.time() - max_age if max_age is not None else 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT reference, status FROM outcomes WHERE action = ? AND updated_at >= ?", (action, since)
+            ).fetchall()
+        statuses = dict(rows)
+        if references is None:
+            return statuses
+        return {reference: statuses[reference] for reference in references if reference in statuses}
+
+    def references_with_status(self, action, statuses, references=None, max_age=None):
+        """Returns the references (in input order when given) whose latest status is in `statuses`."""
+        journaled = self.statuses(action, references, max_age)
+        return [reference for reference, status in journaled.items() if status in statuses]
+
+    def clear(self, action, references=None):
+        """
+        Drops the outcomes of references for an action (all of them if `references` is None).
+
+        Returns:
+            int: The number of outcomes dropped.
+        """
+        with self._lock, self._conn:
+            if references is None:
+                cursor = self._conn.execute("DELETE FROM outcomes WHERE action = ?", (action,))
+            else:
+                cursor = self._conn.executemany(
+                    "DELETE FROM outcomes WHERE action = ? AND reference = ?",
+                    [(action, reference) for reference in dict.fromkeys(references)],
+                )
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_journal():
+    """Returns the process-wide Journal."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = Journal()
+        return _journal
@@ -0,0 +1,129 @@
+"""Process-wide LRU cache of parsed uploads and computed results, keyed on content hashes."""
+import hashlib
+import io
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Memory budget in MB; override with RESTAUCONCEPT_MEMO_CACHE_MB
+DEFAULT_MAX_MB = int(os.environ.get("RESTAUCONCEPT_MEMO_CACHE_MB", "256"))
+
+# Digests of Streamlit uploads by file_id, which changes whenever a file is uploaded again
+MAX_UPLOAD_DIGESTS = 256
+
+_cache = None
+_cache_lock = threading.Lock()
+_upload_digests = OrderedDict()
+_upload_digests_lock = threading.Lock()
+
+
+def file_digest(uploaded_file):
+    """Returns the BLAKE2 digest of an upload's content, without moving its read position."""
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id is not None:
+        with _upload_digests_lock:
+            digest = _upload_digests.get(file_id)
+        if digest is None:
+            digest = _content_digest(uploaded_file)
+            with _upload_digests_lock:
+                _upload_digests[file_id] = digest
+                while len(_upload_digests) > MAX_UPLOAD_DIGESTS:
+                    _upload_digests.popitem(last=False)
+        return digest
+    return _content_digest(uploaded_file)
+
+
+def _content_digest(uploaded_file):
+    if hasattr(uploaded_file, "getbuffer"):
+        data = uploaded_file.getbuffer()
+    else:
+        position = uploaded_file.tell()
+        uploaded_file.seek(0)
+        data = uploaded_file.read()
+        uploaded_file.seek(position)
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def estimate_size(value):
+    """Roughly estimates the memory held by a cached value, in bytes."""
+    # A value can only be a DataFrame once pandas is imported; this module does not import it
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if pd is not None and isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if isinstance(value, io.BytesIO):
+        # getsizeof stops counting the buffer once getvalue() has shared it
+        return len(value.getbuffer())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class MemoCache:
+    """LRU cache bounded by the estimated memory of its values."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        """Stores a value, evicting the least recently used entries beyond the budget."""
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                logger.info(f"Not caching a {size / 1e6:.0f} MB value larger than the cache budget.")
+                return
+            self._entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for `key`, computing and caching it on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+        with self._lock:
+            self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+def get_memo_cache():
+    """Returns the process-wide MemoCache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MemoCache()
+        return _cache
@@ -0,0 +1,12 @@
+"""Local storage locations of the admin tools."""
+import os
+import re
+from pathlib import Path
+
+# Root of every local cache, journal and store; override with RESTAUCONCEPT_DATA_DIR
+DATA_DIR = Path(os.environ.get("RESTAUCONCEPT_DATA_DIR", Path.home() / ".restauconcept"))
+
+
+def slug(name):
+    """Returns a file name for a marque or catalog name ("Bartscher / Pro" -> "Bartscher_Pro")."""
+    return re.sub(r"[^\w.-]+", "_", name.strip()).strip("_") or "_"
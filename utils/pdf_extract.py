@@ -0,0 +1,49 @@
+"""Worker-side helpers for extracting PDF tables in separate processes."""
+import io
+import os
+
+DEFAULT_WORKERS = max(1, min(os.cpu_count() or 1, 8))
+
+
+def open_pdf(source):
+    """Opens a PDF from a path or from its raw bytes."""
+    import pdfplumber
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return pdfplumber.open(source)
+
+
+def page_count(source):
+    with open_pdf(source) as pdf:
+        return len(pdf.pages)
+
+
+_worker_pdf = None
+
+
+def init_worker(source):
+    """Process pool initializer: opens the PDF once per worker process."""
+    global _worker_pdf
+    _worker_pdf = open_pdf(source)
+
+
+def extract_page_tables(page_numbers):
+    """
+    Extracts the tables of some pages from the PDF opened by init_worker.
+
+    Returns:
+        list: (page number, tables) pairs in the order of `page_numbers`.
+    """
+    results = []
+    for page_num in page_numbers:
+        page = _worker_pdf.pages[page_num]
+        results.append((page_num, page.extract_tables()))
+        page.close()
+    return results
+
+
+def chunk_pages(page_numbers, workers):
+    """Splits pages into small chunks so that workers stay balanced and progress is frequent."""
+    size = max(1, min(8, len(page_numbers) // (workers * 4) or 1))
+    return [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
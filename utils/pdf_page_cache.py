@@ -0,0 +1,242 @@
+"""On-disk cache of extracted PDF tables, per document and per page content."""
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+
+from utils.paths import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = DATA_DIR / "pdf_cache"
+# Size cap in MB; override with RESTAUCONCEPT_PDF_CACHE_MB
+DEFAULT_MAX_MB = int(os.environ.get("RESTAUCONCEPT_PDF_CACHE_MB", "500"))
+# Bump when the extraction settings change, so older entries are not reused
+EXTRACTION_VERSION = "extract_tables-default-1"
+# Bump when the page fingerprint changes, so the document indexes are rebuilt
+FINGERPRINT_VERSION = "2"
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def _hash_object(h, obj, memo):
+    """
+    Hashes a PDF object and everything it references (dicts, arrays, streams with their decoded data).
+
+    The digest of each indirect object is kept in `memo`, so objects shared by
+    several pages (fonts, their programs and ToUnicode maps) are decoded once.
+    """
+    from pdfminer.pdftypes import PDFObjRef, PDFStream
+    from pdfminer.psparser import PSLiteral
+
+    if isinstance(obj, PDFObjRef):
+        digest = memo.get(obj.objid)
+        if digest is None:
+            memo[obj.objid] = b"cycle"
+            sub = hashlib.blake2b(digest_size=20)
+            _hash_object(sub, obj.resolve(), memo)
+            digest = memo[obj.objid] = sub.digest()
+        h.update(digest)
+    elif isinstance(obj, PDFStream):
+        h.update(b"stream")
+        _hash_object(h, {key: value for key, value in obj.attrs.items() if key not in ("Length", "Filter")}, memo)
+        h.update(obj.get_data())
+    elif isinstance(obj, dict):
+        h.update(b"dict")
+        for key in sorted(obj):
+            if key != "Parent":
+                h.update(str(key).encode())
+                _hash_object(h, obj[key], memo)
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"array")
+        for item in obj:
+            _hash_object(h, item, memo)
+    elif isinstance(obj, PSLiteral):
+        h.update(b"/" + str(obj.name).encode())
+    else:
+        h.update(repr(obj).encode())
+
+
+def _hash_resources(h, resources, memo, forms_seen=()):
+    """Hashes the fonts of a resource dictionary and the form XObjects it draws, recursing into nested forms."""
+    from pdfminer.pdftypes import PDFObjRef, PDFStream, resolve1
+
+    resources = resolve1(resources) or {}
+    fonts = resolve1(resources.get("Font")) or {}
+    for name in sorted(fonts):
+        h.update(str(name).encode())
+        _hash_object(h, fonts[name], memo)
+    xobjects = resolve1(resources.get("XObject")) or {}
+    for name in sorted(xobjects):
+        ref = xobjects[name]
+        objid = ref.objid if isinstance(ref, PDFObjRef) else None
+        xobject = resolve1(ref)
+        if not isinstance(xobject, PDFStream) or getattr(xobject.get("Subtype"), "name", None) != "Form":
+            continue
+        h.update(str(name).encode())
+        if objid is not None and objid in forms_seen:
+            continue
+        h.update(xobject.get_data())
+        _hash_resources(h, xobject.get("Resources"), memo, (*forms_seen, objid))
+
+
+def _page_fingerprint(page, memo=None):
+    """
+    Hashes what the tables of a page are extracted from.
+
+    That is the page's content streams and media box, its fonts (with their
+    encodings, ToUnicode maps and font programs) and the form XObjects it
+    draws, with their own fonts and nested forms.
+    """
+    from pdfminer.pdftypes import PDFStream, resolve1
+
+    memo = {} if memo is None else memo
+    h = hashlib.blake2b(digest_size=20)
+    h.update(EXTRACTION_VERSION.encode())
+    h.update(FINGERPRINT_VERSION.encode())
+    h.update(repr(page.mediabox).encode())
+    page_obj = page.page_obj
+    for stream in page_obj.contents:
+        stream = resolve1(stream)
+        if isinstance(stream, PDFStream):
+            h.update(stream.get_data())
+    _hash_resources(h, page_obj.resources, memo)
+    return h.hexdigest()
+
+
+class PdfPageCache:
+    """
+    Stores the tables of each extracted page under the fingerprint of its content.
+
+    An identical re-upload is recognized by its document hash and served
+    without fingerprinting; in a revised document only pages whose content
+    changed miss the cache. Entries are evicted least recently used first
+    beyond `max_bytes`.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.pages_dir = root / "pages"
+        self.docs_dir = root / "docs"
+        self.pages_dir.mkdir(parents=True, exist_ok=True)
+        self.docs_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Total size in bytes, rescanned after the next write
+        self._size = None
+
+    def fingerprints(self, source, page_numbers):
+        """
+        Returns {page number: fingerprint} for the requested pages.
+
+        Args:
+            source: PDF path or raw bytes.
+        """
+        data = source if isinstance(source, (bytes, bytearray)) else open(source, "rb").read()
+        doc_path = self.docs_dir / f"{_digest(data)}-{FINGERPRINT_VERSION}.json"
+        known = {}
+        if doc_path.exists():
+            with open(doc_path, "r", encoding="utf-8") as f:
+                known = {int(page_num): fingerprint for page_num, fingerprint in json.load(f).items()}
+            os.utime(doc_path)
+
+        missing = [page_num for page_num in page_numbers if page_num not in known]
+        if missing:
+            import pdfplumber
+
+            # Digests of the objects shared by the pages of the document
+            memo = {}
+            with pdfplumber.open(io.BytesIO(data)) as pdf:
+                for page_num in missing:
+                    known[page_num] = _page_fingerprint(pdf.pages[page_num], memo)
+            with open(doc_path, "w", encoding="utf-8") as f:
+                json.dump(known, f)
+            self._size = None
+        return {page_num: known[page_num] for page_num in page_numbers}
+
+    def _page_path(self, fingerprint):
+        return self.pages_dir / f"{fingerprint}.json"
+
+    def has(self, fingerprint):
+        return self._page_path(fingerprint).exists()
+
+    def get(self, fingerprint):
+        """Returns the cached tables of a page, or None on a miss."""
+        path = self._page_path(fingerprint)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                tables = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(path)
+        return tables
+
+    def put(self, fingerprint, tables):
+        """Stores the tables of a page; call evict() once a batch of pages is stored."""
+        path = self._page_path(fingerprint)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(tables, f)
+        os.replace(tmp_path, path)
+        self._size = None
+
+    def _entries(self):
+        entries = []
+        for directory in (self.pages_dir, self.docs_dir):
+            for entry in os.scandir(directory):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def size(self):
+        """Returns the total size of the cache in bytes, without rescanning it when nothing was written."""
+        size = self._size
+        if size is None:
+            size = self._size = sum(size for _, size, _ in self._entries())
+        return size
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            self._size = total
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+            self._size = total
+            logger.info("Evicted old PDF cache entries.")
+
+    def clear(self):
+        """Deletes every cached page and document index."""
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
+
+
+def get_pdf_page_cache():
+    """Returns the process-wide PdfPageCache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PdfPageCache()
+        return _cache
@@ -0,0 +1,157 @@
+"""Fast pypdfium2 pre-scan that finds the pages worth a pdfplumber table extraction."""
+import argparse
+import io
+import time
+from itertools import islice
+
+# pdfplumber's default table strategy builds tables from ruling lines and
+# rectangles, which pdfium reports as path objects: a page without any
+# cannot yield a table.
+DEFAULT_MIN_PATHS = 1
+DEFAULT_MIN_CHARS = 0
+FORM_DEPTH = 8
+
+
+class PageScan:
+    """Pre-scan result of one page."""
+
+    def __init__(self, page_num, paths, chars, candidate):
+        self.page_num = page_num
+        self.paths = paths
+        self.chars = chars
+        self.candidate = candidate
+
+
+def parse_page_range(text, page_total):
+    """
+    Parses a 1-based page range such as "1-20, 35" into sorted 0-based page numbers.
+
+    Raises:
+        ValueError: If the range is malformed or outside the document.
+    """
+    pages = set()
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        start, _, end = part.partition("-")
+        first, last = int(start), int(end or start)
+        if first < 1 or last > page_total or first > last:
+            raise ValueError(f"Page range {part!r} is outside 1-{page_total}.")
+        pages.update(range(first - 1, last))
+    return sorted(pages)
+
+
+def _open(source):
+    import pypdfium2 as pdfium
+
+    if isinstance(source, (bytes, bytearray)):
+        return pdfium.PdfDocument(bytes(source))
+    return pdfium.PdfDocument(source)
+
+
+def prescan_pages(source, page_numbers=None, min_paths=DEFAULT_MIN_PATHS, min_chars=DEFAULT_MIN_CHARS):
+    """
+    Classifies pages as likely or unlikely to contain tables.
+
+    A page is a candidate when it has at least `min_paths` path objects
+    (including those nested in form XObjects) and `min_chars` text characters.
+
+    Args:
+        source: PDF path or raw bytes.
+        page_numbers: 0-based pages to scan, defaults to every page.
+
+    Returns:
+        list: One PageScan per scanned page, in page order.
+    """
+    import pypdfium2.raw as pdfium_c
+
+    pdf = _open(source)
+    try:
+        page_numbers = range(len(pdf)) if page_numbers is None else page_numbers
+        scans = []
+        for page_num in page_numbers:
+            page = pdf[page_num]
+            try:
+                path_objects = page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_PATH], max_depth=FORM_DEPTH)
+                paths = sum(1 for _ in islice(path_objects, max(min_paths, 1)))
+                textpage = page.get_textpage()
+                chars = textpage.count_chars()
+                textpage.close()
+            finally:
+                page.close()
+            scans.append(PageScan(page_num, paths, chars, paths >= min_paths and chars >= min_chars))
+        return scans
+    finally:
+        pdf.close()
+
+
+def candidate_pages(source, page_numbers=None, **thresholds):
+    """
+    Returns the candidate pages and the pre-scan duration.
+
+    Returns:
+        tuple: (sorted 0-based candidate pages, seconds)
+    """
+    started = time.perf_counter()
+    scans = prescan_pages(source, page_numbers, **thresholds)
+    return [scan.page_num for scan in scans if scan.candidate], time.perf_counter() - started
+
+
+def check_prescan_accuracy(source, **thresholds):
+    """
+    Compares the pre-scan with a full pdfplumber scan of every page.
+
+    Returns:
+        dict: Page counts, the skipped pages that do contain tables (misses),
+        and the timings of the pre-scan, the full scan and the candidate-only scan.
+    """
+    import pdfplumber
+
+    candidates, prescan_seconds = candidate_pages(source, **thresholds)
+    candidate_set = set(candidates)
+
+    started = time.perf_counter()
+    pages_with_tables = set()
+    candidate_seconds = 0.0
+    with pdfplumber.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source) as pdf:
+        total = len(pdf.pages)
+        for page_num, page in enumerate(pdf.pages):
+            page_started = time.perf_counter()
+            if page.extract_tables():
+                pages_with_tables.add(page_num)
+            page.close()
+            if page_num in candidate_set:
+                candidate_seconds += time.perf_counter() - page_started
+    full_seconds = time.perf_counter() - started
+
+    skipped = sorted(set(range(total)) - candidate_set)
+    return {
+        "pages": total,
+        "candidates": len(candidates),
+        "skipped": len(skipped),
+        "missed_pages": sorted(pages_with_tables - candidate_set),
+        "pages_with_tables": len(pages_with_tables),
+        "prescan_seconds": prescan_seconds,
+        "full_scan_seconds": full_seconds,
+        "prescan_and_candidates_seconds": prescan_seconds + candidate_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the table pre-scan against a full pdfplumber scan.")
+    parser.add_argument("pdfs", nargs="+", help="Sample PDF documents")
+    parser.add_argument("--min-paths", type=int, default=DEFAULT_MIN_PATHS)
+    parser.add_argument("--min-chars", type=int, default=DEFAULT_MIN_CHARS)
+    args = parser.parse_args()
+
+    for path in args.pdfs:
+        report = check_prescan_accuracy(path, min_paths=args.min_paths, min_chars=args.min_chars)
+        missed = report["missed_pages"]
+        print(
+            f"{path}: {report['pages']} pages, {report['skipped']} skipped, "
+            f"{len(missed)} missed{' ' + str([page + 1 for page in missed]) if missed else ''}; "
+            f"pre-scan {report['prescan_seconds']:.2f}s, full scan {report['full_scan_seconds']:.2f}s, "
+            f"pre-scan + candidates {report['prescan_and_candidates_seconds']:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
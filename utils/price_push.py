@@ -0,0 +1,255 @@
+"""Pushes price changes to the admin product edit form over HTTP, with a dry run and read-back."""
+import logging
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin
+
+from utils.admin_urls import product_edit_url
+from utils.http_scraper import DEFAULT_WORKERS, HttpListingScraper, build_form_request, parse_page
+from utils.table_extract import LISTING_COLUMNS
+from utils.timing import TOTAL_STEP, StepTimer
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_FORM_NAME = "prodForm"
+SEARCH_FIELD = "showPhrase"
+EDIT_LINK_TEXT = "Editer"
+SUBMIT_TEXT = "Mettre à jour"
+# Name (or id) of the price input of prodForm
+DEFAULT_PRICE_FIELD = "price"
+# Name of the reference input of prodForm, checked when an edit page is opened from an indexed id
+REFERENCE_FIELD = "reference"
+# Prices within this tolerance are considered equal
+PRICE_TOLERANCE = 0.005
+# Characters dropped from a price text, and the separators before the decimal one
+NON_PRICE_CHARS = r"[^\d.,]"
+THOUSANDS_SEPARATORS = r"[.,](?=\d*[.,])"
+
+# Per-reference outcomes
+STATUS_UPDATED = "updated"              # Submitted and confirmed by reading the form back
+STATUS_WOULD_UPDATE = "would_update"    # Dry run: the admin shows the old price
+STATUS_UP_TO_DATE = "up_to_date"        # The admin already shows the new price
+STATUS_STALE = "stale"                  # The admin shows neither the old nor the new price
+STATUS_MISMATCH = "mismatch"            # Submitted, but the price read back differs
+STATUS_NOT_FOUND = "not_found"
+STATUS_AMBIGUOUS = "ambiguous"          # Several search results have exactly the reference
+STATUS_INVALID_PRICE = "invalid_price"  # The new price is missing or not a finite number; nothing is submitted
+STATUS_FAILED = "failed"
+OK_STATUSES = (STATUS_UPDATED, STATUS_WOULD_UPDATE, STATUS_UP_TO_DATE)
+
+JOURNAL_ACTION = "price_update"
+MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+DEFAULT_CONCURRENCY = 8
+MAX_CONCURRENCY = 16
+
+
+def parse_price(text):
+    """
+    Parses a price such as "1 896,10 €" or "1,896.10"; the last separator is the decimal one.
+
+    Returns:
+        float: The price, or None if `text` has no digits.
+    """
+    digits = re.sub(NON_PRICE_CHARS, "", str(text))
+    digits = re.sub(THOUSANDS_SEPARATORS, "", digits).replace(",", ".")
+    try:
+        return float(digits)
+    except ValueError:
+        return None
+
+
+def format_price(price, like=""):
+    """Formats a price with two decimals, using a decimal comma if the admin's current value does."""
+    text = f"{price:.2f}"
+    return text.replace(".", ",") if "," in like else text
+
+
+def same_price(a, b):
+    return a is not None and b is not None and abs(a - b) < PRICE_TOLERANCE
+
+
+class PricePusher:
+    """
+    Updates product prices through the prodForm edit form with concurrent workers on one login.
+
+    For each (reference, old price, new price), the edit form of the product
+    is opened (directly when its id is in `product_index`, through a search
+    otherwise) and the current price compared with the old one. A dry
+    run stops there. Otherwise the new price is submitted and the form is read
+    back to confirm the stored price. A product showing neither the old nor
+    the new price is reported as STATUS_STALE and left untouched.
+    """
+
+    def __init__(
+        self, username, password, session_cache=None, price_field=DEFAULT_PRICE_FIELD,
+        concurrency=DEFAULT_CONCURRENCY, journal=None, product_index=None,
+    ):
+        self.price_field = price_field
+        self.product_index = product_index
+        self.concurrency = concurrency
+        self.journal = journal
+        self.timer = StepTimer()
+        self.client = HttpListingScraper(
+            username, password, session_cache, max_workers=concurrency, pool_size=concurrency + DEFAULT_WORKERS,
+        )
+
+    def close(self):
+        self.client.close()
+
+    def _search_edit_url(self, reference, search_form, search_url):
+        """
+        Searches a reference and returns the URL of the edit page of the result row with exactly that reference.
+
+        Returns:
+            tuple: (edit URL, None), or (None, STATUS_NOT_FOUND / STATUS_AMBIGUOUS).
+        """
+        method, url, payload = build_form_request(
+            search_form, search_url, {SEARCH_FIELD: reference}, submit_text="Rechercher"
+        )
+        response = self.client.submit(method, url, payload)
+        results = parse_page(response.text)
+        reference_cell, id_cell = LISTING_COLUMNS["Référence"], LISTING_COLUMNS["No"]
+        matches = []
+        for row, links in zip(results.rows, results.row_links):
+            if len(row) > reference_cell and row[reference_cell].strip() == reference:
+                href = next((href for href, text in links if href and EDIT_LINK_TEXT in text), None)
+                if href:
+                    matches.append((row[id_cell].strip(), urljoin(response.url, href)))
+        if not matches:
+            return None, STATUS_NOT_FOUND
+        if len(matches) > 1:
+            return None, STATUS_AMBIGUOUS
+        product_id, edit_url = matches[0]
+        if self.product_index is not None and product_id.isdigit():
+            self.product_index.learn(reference, product_id)
+        return edit_url, None
+
+    def _open_indexed(self, reference):
+        """
+        Returns (edit URL, prodForm, price text) of the indexed product id of a reference, or None.
+
+        The id is dropped from the index, and None returned so that the
+        reference is searched, when the edit page no longer opens or shows
+        another reference (the product's reference was edited since the scrape).
+        """
+        product_id = self.product_index.product_id(reference) if self.product_index is not None else None
+        if product_id is None:
+            return None
+        from requests import HTTPError
+
+        edit_url = product_edit_url(product_id)
+        try:
+            with self.timer.span("open_edit", reference):
+                form, current = self._read_form(edit_url)
+        except (HTTPError, RuntimeError) as e:
+            logger.warning(f"Product {product_id} no longer opens for {reference} ({e}); searching it instead.")
+            self.product_index.forget(reference, product_id)
+            return None
+        shown = next((value.strip() for name, value in form["fields"] if name == REFERENCE_FIELD), None)
+        if shown != reference:
+            logger.warning(
+                f"Product {product_id} now has the reference {shown!r}, not {reference}; searching it instead."
+            )
+            self.product_index.forget(reference, product_id)
+            return None
+        return edit_url, form, current
+
+    def _read_form(self, edit_url):
+        """Returns (prodForm, current price text) of an edit page."""
+        page = parse_page(self.client.get(edit_url).text)
+        form = next((form for form in page.forms if form["name"] == PRODUCT_FORM_NAME), None)
+        if form is None:
+            raise RuntimeError(f"{PRODUCT_FORM_NAME} not found on {edit_url}")
+        field = form["ids"].get(self.price_field, self.price_field)
+        current = next((value for name, value in form["fields"] if name == field), None)
+        if current is None:
+            raise RuntimeError(f"Price field {self.price_field!r} not found in {PRODUCT_FORM_NAME}")
+        return form, current
+
+    def push_one(self, reference, old_price, new_price, search_form, search_url, dry_run=True):
+        """Processes one price change and returns its STATUS_* and the price shown by the admin."""
+        if new_price is None or not math.isfinite(new_price):
+            logger.error(f"Refusing to push the price {new_price!r} of {reference}.")
+            return STATUS_INVALID_PRICE, None
+        span = self.timer.span
+        opened = self._open_indexed(reference)
+        if opened is None:
+            with span("search", reference):
+                edit_url, status = self._search_edit_url(reference, search_form, search_url)
+            if edit_url is None:
+                return status, None
+            with span("open_edit", reference):
+                opened = (edit_url, *self._read_form(edit_url))
+        edit_url, form, current_text = opened
+        current = parse_price(current_text)
+        if same_price(current, new_price):
+            return STATUS_UP_TO_DATE, current
+        if not same_price(current, old_price):
+            return STATUS_STALE, current
+        if dry_run:
+            return STATUS_WOULD_UPDATE, current
+
+        with span("submit", reference):
+            method, url, payload = build_form_request(
+                form, edit_url, {self.price_field: format_price(new_price, like=current_text)}, submit_text=SUBMIT_TEXT
+            )
+            self.client.submit(method, url, payload, form["enctype"])
+        with span("read_back", reference):
+            _, stored_text = self._read_form(edit_url)
+        stored = parse_price(stored_text)
+        return (STATUS_UPDATED if same_price(stored, new_price) else STATUS_MISMATCH), stored
+
+    def _push_with_retries(self, change, search_form, search_url, dry_run):
+        reference, old_price, new_price = change
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                with self.timer.span(TOTAL_STEP, reference):
+                    status, shown = self.push_one(reference, old_price, new_price, search_form, search_url, dry_run)
+                return status, shown, attempt
+            except Exception as e:
+                if attempt == MAX_ATTEMPTS:
+                    logger.error(f"Error updating the price of {reference}: {e}")
+                    return STATUS_FAILED, None, attempt
+                delay = RETRY_BASE_DELAY * 2 ** (attempt - 1)
+                logger.warning(f"Retrying reference {reference} in {delay:.0f}s (attempt {attempt} failed: {e}).")
+                time.sleep(delay)
+
+    def run(self, changes, dry_run=True, on_result=None):
+        """
+        Pushes the price changes, `concurrency` references at a time.
+
+        Args:
+            changes: Iterable of (reference, old price, new price).
+            dry_run: Only check each product against the old price, without submitting.
+            on_result: Called with (reference, status) as each reference completes.
+
+        Returns:
+            dict: Reference -> {"status", "admin_price", "old_price", "new_price"}, or None if login failed.
+        """
+        self.timer = StepTimer()
+        with self.timer.span("login"):
+            if not self.client.login():
+                return None
+        search_form, search_url = self.client.search_form()
+        changes = list(changes)
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self._push_with_retries, change, search_form, search_url, dry_run): change
+                for change in changes
+            }
+            for future in as_completed(futures):
+                reference, old_price, new_price = futures[future]
+                status, shown, attempts = future.result()
+                results[reference] = {
+                    "status": status, "admin_price": shown, "old_price": old_price, "new_price": new_price,
+                }
+                if self.journal is not None and not dry_run:
+                    self.journal.record(JOURNAL_ACTION, reference, status, attempts)
+                if on_result is not None:
+                    on_result(reference, status)
+        return {reference: results[reference] for reference, _, _ in changes}
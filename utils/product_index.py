@@ -0,0 +1,156 @@
+"""Persistent reference -> admin product id index, built from scraped snapshots and searches."""
+import logging
+import sqlite3
+import threading
+import time
+
+from utils.paths import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = DATA_DIR / "product_index.sqlite3"
+REFERENCE_FIELD = "Référence"
+PRODUCT_ID_FIELD = "No"
+# Marque of the ids learned from a search rather than from a scrape
+SEARCH_SOURCE = ""
+
+_index = None
+_index_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    reference TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    marque TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (reference, product_id)
+);
+CREATE INDEX IF NOT EXISTS products_marque ON products (marque);
+CREATE TABLE IF NOT EXISTS marques (
+    marque TEXT PRIMARY KEY,
+    snapshot_id TEXT NOT NULL
+);
+"""
+
+
+def product_entries(records):
+    """Returns the unique (reference, product id) pairs of listing records, skipping incomplete rows."""
+    entries = set()
+    for record in records:
+        reference = str(record.get(REFERENCE_FIELD) or "").strip()
+        product_id = str(record.get(PRODUCT_ID_FIELD) or "").strip()
+        if reference and product_id.isdigit():
+            entries.add((reference, product_id))
+    return entries
+
+
+class ProductIndex:
+    """
+    SQLite index of the admin product id ("No" column) of each reference.
+
+    The entries of a marque are replaced from its latest snapshot by
+    `refresh`, which skips marques whose snapshot was already indexed. Ids
+    found by a search are added with `learn`, and ids that no longer open an
+    edit form are dropped with `forget`. A reference listed under several
+    ids is ambiguous and has no id, so it is always searched.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def update_marque(self, marque, records, snapshot_id=""):
+        """Replaces the entries of a marque with those of its listing records."""
+        now = time.time()
+        entries = product_entries(records)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM products WHERE marque = ?", (marque,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO products (reference, product_id, marque, updated_at) VALUES (?, ?, ?, ?)",
+                [(reference, product_id, marque, now) for reference, product_id in entries],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO marques (marque, snapshot_id) VALUES (?, ?)", (marque, snapshot_id)
+            )
+        return len(entries)
+
+    def refresh(self, store):
+        """
+        Indexes the latest snapshot of every marque of a SnapshotStore not indexed yet.
+
+        Returns:
+            int: The number of marques (re)indexed.
+        """
+        with self._lock:
+            indexed = dict(self._conn.execute("SELECT marque, snapshot_id FROM marques").fetchall())
+        refreshed = 0
+        for marque in store.list_marques():
+            snapshot_id = store.latest(marque)
+            if snapshot_id is None or indexed.get(marque) == snapshot_id:
+                continue
+            try:
+                records = store.load(marque, snapshot_id).to_dict("records")
+            except Exception as e:
+                logger.error(f"Could not index the snapshot {snapshot_id} of {marque}: {e}")
+                continue
+            self.update_marque(marque, records, snapshot_id)
+            refreshed += 1
+        if refreshed:
+            logger.info(f"Indexed the product ids of {refreshed} marques.")
+        return refreshed
+
+    def learn(self, reference, product_id):
+        """Records the id found by searching a reference."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO products (reference, product_id, marque, updated_at) VALUES (?, ?, ?, ?)",
+                (reference, str(product_id), SEARCH_SOURCE, time.time()),
+            )
+
+    def forget(self, reference, product_id):
+        """Drops an id that no longer matches the reference."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM products WHERE reference = ? AND product_id = ?", (reference, str(product_id))
+            )
+
+    def product_ids(self, references=None):
+        """
+        Returns the product id of references listed under a single id.
+
+        Returns:
+            dict: Reference -> product id, for the unambiguous indexed references only.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT reference, MIN(product_id) FROM products GROUP BY reference HAVING COUNT(*) = 1"
+            ).fetchall()
+        ids = dict(rows)
+        if references is None:
+            return ids
+        return {reference: ids[reference] for reference in references if reference in ids}
+
+    def product_id(self, reference):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT product_id FROM products WHERE reference = ?", (reference,)
+            ).fetchall()
+        return rows[0][0] if len(rows) == 1 else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_product_index():
+    """Returns the process-wide ProductIndex."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ProductIndex()
+        return _index
@@ -0,0 +1,156 @@
+"""Disk cache of authenticated Playwright sessions, one storage state per admin user."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from utils.admin_urls import ADMIN_DEFAULT_URL, LOGIN_PAGE_URL
+from utils.paths import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = DATA_DIR / "sessions"
+DEFAULT_TTL_SECONDS = 4 * 60 * 60
+
+
+class SessionCache:
+    """Saves Playwright storage states (cookies) per username with an expiry."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, username):
+        digest = hashlib.sha256(username.encode("utf-8")).hexdigest()[:32]
+        return self.cache_dir / f"{digest}.json"
+
+    def load(self, username):
+        """
+        Returns the saved storage state for a user.
+
+        Returns:
+            dict: The Playwright storage state, or None if missing, unreadable or expired.
+        """
+        path = self._path(username)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable session cache {path}: {e}")
+            return None
+
+        if time.time() - entry.get("saved_at", 0) > self.ttl_seconds:
+            logger.info("Cached session expired.")
+            self.invalidate(username)
+            return None
+        return entry.get("storage_state")
+
+    def save(self, username, storage_state):
+        """Writes the storage state for a user, readable by the owner only."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(username)
+        tmp_path = path.with_suffix(".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "storage_state": storage_state}, f)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, username):
+        """Removes the saved session of a user, if any."""
+        try:
+            self._path(username).unlink()
+        except FileNotFoundError:
+            pass
+
+
+async def is_session_alive(page) -> bool:
+    """Checks a session with a single request to the admin home page."""
+    try:
+        await page.goto(ADMIN_DEFAULT_URL, wait_until="domcontentloaded")
+    except Exception as e:
+        logger.warning(f"Session check failed: {e}")
+        return False
+    return page.url != LOGIN_PAGE_URL and "logon.asp" not in page.url
+
+
+async def open_admin_context(browser, username, login, session_cache=None):
+    """
+    Opens a browser context logged into the admin portal.
+
+    `browser` is anything with a Playwright-style `new_context`, such as a
+    Browser or a utils.browser.BrowserSession.
+
+    Reuses the cached session of `username` when it is still valid, and only
+    calls `login(page)` when there is none or it has expired.
+
+    Returns:
+        BrowserContext: The authenticated context, or None if login failed.
+    """
+    session_cache = session_cache or SessionCache()
+
+    storage_state = session_cache.load(username)
+    if storage_state:
+        context = await browser.new_context(storage_state=storage_state)
+        page = await context.new_page()
+        if await is_session_alive(page):
+            logger.info("Reusing cached admin session.")
+            await page.close()
+            return context
+        logger.info("Cached admin session rejected, logging in again.")
+        await context.close()
+        session_cache.invalidate(username)
+
+    context = await browser.new_context()
+    page = await context.new_page()
+    if not await login(page):
+        await context.close()
+        return None
+    session_cache.save(username, await context.storage_state())
+    await page.close()
+    return context
+
+
+async def clone_admin_contexts(browser, login_context, count):
+    """
+    Returns `count` contexts sharing the admin session of `login_context`.
+
+    The login context is reused for the first one; the others are new
+    contexts of `browser` opened with its storage state.
+    """
+    contexts = [login_context]
+    if count > 1:
+        storage_state = await login_context.storage_state()
+        for _ in range(count - 1):
+            contexts.append(await browser.new_context(storage_state=storage_state))
+    return contexts
+
+
+async def process_queue(contexts, items, process):
+    """
+    Processes items concurrently with one page per context, taking them from a shared queue.
+
+    `process(context, page, item)` is awaited for each item and must handle
+    its own errors; a worker stops once the queue is empty.
+    """
+    queue = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+
+    async def worker(context):
+        page = await context.new_page()
+        try:
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                await process(context, page, item)
+        finally:
+            await page.close()
+
+    await asyncio.gather(*(worker(context) for context in contexts))
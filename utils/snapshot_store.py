@@ -0,0 +1,137 @@
+"""Versioned Parquet snapshots of scraped catalogs, one directory per marque."""
+import logging
+from datetime import datetime, timedelta, timezone
+
+from utils.paths import DATA_DIR, slug
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = DATA_DIR / "snapshots"
+DEFAULT_RETENTION = 20
+DEFAULT_ARCHIVE_DAYS = 365
+ARCHIVE_FILE = "archive.parquet"
+SNAPSHOT_COLUMN = "snapshot"
+_ID_FORMAT = "%Y%m%dT%H%M%S%fZ"
+
+
+class SnapshotStore:
+    """
+    Stores each scrape as a timestamped, zstd-compressed Parquet file.
+
+    The newest `retention` snapshots of a marque stay as individual files;
+    older ones are compacted into a single per-marque archive (with a
+    `snapshot` column), from which snapshots older than `archive_days` are dropped.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, retention=DEFAULT_RETENTION, archive_days=DEFAULT_ARCHIVE_DAYS):
+        self.root = root
+        self.retention = retention
+        self.archive_days = archive_days
+
+    def _marque_dir(self, marque):
+        return self.root / slug(marque)
+
+    def save(self, marque, records):
+        """
+        Saves a scrape result (list of dicts or DataFrame) as a new snapshot.
+
+        Returns:
+            str: The snapshot id (UTC timestamp).
+        """
+        # Imported here: every page imports this module, but only reading and writing snapshots needs them
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+        directory = self._marque_dir(marque)
+        directory.mkdir(parents=True, exist_ok=True)
+        snapshot_id = datetime.now(timezone.utc).strftime(_ID_FORMAT)
+        path = directory / f"{snapshot_id}.parquet"
+        tmp_path = path.with_suffix(".tmp")
+        table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata({"marque": marque})
+        pq.write_table(table, tmp_path, compression="zstd")
+        tmp_path.replace(path)
+        self.compact(marque)
+        return snapshot_id
+
+    def list_marques(self):
+        if not self.root.exists():
+            return []
+        return sorted(directory.name for directory in self.root.iterdir() if directory.is_dir())
+
+    def list_snapshots(self, marque):
+        """Returns the snapshot ids of a marque, newest first, including archived ones."""
+        directory = self._marque_dir(marque)
+        if not directory.exists():
+            return []
+        ids = {path.stem for path in directory.glob("*.parquet") if path.name != ARCHIVE_FILE}
+        archive = directory / ARCHIVE_FILE
+        if archive.exists():
+            import pyarrow.parquet as pq
+
+            archived = pq.read_table(archive, columns=[SNAPSHOT_COLUMN]).column(SNAPSHOT_COLUMN)
+            ids.update(archived.unique().to_pylist())
+        return sorted(ids, reverse=True)
+
+    def latest(self, marque):
+        snapshots = self.list_snapshots(marque)
+        return snapshots[0] if snapshots else None
+
+    def load(self, marque, snapshot_id=None):
+        """Loads a snapshot (the latest by default) as a DataFrame."""
+        snapshot_id = snapshot_id or self.latest(marque)
+        if snapshot_id is None:
+            raise FileNotFoundError(f"No snapshot stored for marque {marque!r}.")
+        import pyarrow.parquet as pq
+
+        directory = self._marque_dir(marque)
+        path = directory / f"{snapshot_id}.parquet"
+        if path.exists():
+            return pq.read_table(path).to_pandas()
+        table = pq.read_table(directory / ARCHIVE_FILE, filters=[(SNAPSHOT_COLUMN, "=", snapshot_id)])
+        if table.num_rows == 0:
+            raise FileNotFoundError(f"Snapshot {snapshot_id} of marque {marque!r} not found.")
+        return table.drop_columns([SNAPSHOT_COLUMN]).to_pandas()
+
+    @staticmethod
+    def timestamp(snapshot_id):
+        """Returns the UTC datetime of a snapshot id."""
+        return datetime.strptime(snapshot_id, _ID_FORMAT).replace(tzinfo=timezone.utc)
+
+    def compact(self, marque):
+        """Moves snapshots beyond the retention into the archive and prunes expired archived ones."""
+        directory = self._marque_dir(marque)
+        files = sorted(
+            (path for path in directory.glob("*.parquet") if path.name != ARCHIVE_FILE),
+            key=lambda path: path.stem,
+            reverse=True,
+        )
+        expired = files[self.retention:]
+        archive = directory / ARCHIVE_FILE
+        if not expired and not archive.exists():
+            return
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        tables = []
+        if archive.exists():
+            tables.append(pq.read_table(archive))
+        for path in expired:
+            table = pq.read_table(path).replace_schema_metadata(None)
+            tables.append(table.append_column(SNAPSHOT_COLUMN, pa.array([path.stem] * table.num_rows, pa.string())))
+        merged = pa.concat_tables(tables, promote_options="default")
+
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.archive_days)).strftime(_ID_FORMAT)
+        merged = merged.filter(pc.greater_equal(merged.column(SNAPSHOT_COLUMN), cutoff))
+        if not expired and merged.num_rows == pq.read_metadata(archive).num_rows:
+            return
+
+        tmp_path = archive.with_suffix(".tmp")
+        pq.write_table(merged.sort_by(SNAPSHOT_COLUMN), tmp_path, compression="zstd")
+        tmp_path.replace(archive)
+        for path in expired:
+            path.unlink()
+        if expired:
+            logger.info(f"Compacted {len(expired)} snapshots of {marque} into the archive.")
@@ -0,0 +1,69 @@
+"""Per-page load times of the Streamlit app: the first (cold) run of each page in the process, then warm reruns."""
+import csv
+import io
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from utils.timing import percentile
+
+logger = logging.getLogger(__name__)
+
+# Warm reruns kept per page
+MAX_WARM_LOADS = 500
+LOAD_FIELDS = ["Page", "Cold (s)", "Warm runs", "Warm p50 (s)", "Warm p95 (s)", "Warm max (s)"]
+
+_loads = {}
+_loads_lock = threading.Lock()
+
+
+def record_page_load(page, seconds):
+    """Records one run of a page; the first one of the process is its cold load."""
+    with _loads_lock:
+        loads = _loads.get(page)
+        if loads is None:
+            _loads[page] = {"cold": seconds, "warm": deque(maxlen=MAX_WARM_LOADS)}
+            logger.info(f"Cold load of {page}: {seconds:.3f}s")
+        else:
+            loads["warm"].append(seconds)
+
+
+@contextmanager
+def page_load_timer(page):
+    """
+    Times a run of a page script, from the app's `run()` to the end of the script.
+
+    Runs interrupted by st.rerun() or st.stop() are not recorded. The
+    imports at the top of a page are only paid once per process and are not
+    included; `python -m benchmarks.startup` measures them with cold processes.
+    """
+    started = time.perf_counter()
+    yield
+    record_page_load(page, time.perf_counter() - started)
+
+
+def page_load_report():
+    """Returns one row per page with its cold load and warm rerun percentiles, in seconds."""
+    with _loads_lock:
+        loads = {page: (entry["cold"], list(entry["warm"])) for page, entry in _loads.items()}
+    rows = []
+    for page, (cold, warm) in sorted(loads.items()):
+        rows.append({
+            "Page": page,
+            "Cold (s)": round(cold, 3),
+            "Warm runs": len(warm),
+            "Warm p50 (s)": round(percentile(warm, 50), 3) if warm else None,
+            "Warm p95 (s)": round(percentile(warm, 95), 3) if warm else None,
+            "Warm max (s)": round(max(warm), 3) if warm else None,
+        })
+    return rows
+
+
+def page_load_csv():
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=LOAD_FIELDS)
+    writer.writeheader()
+    writer.writerows(page_load_report())
+    return buffer.getvalue()
@@ -0,0 +1,51 @@
+"""Extraction of admin listing tables into records."""
+
+# Listing columns kept for each product row, and the minimum cell count of a product row
+LISTING_COLUMNS = {"Référence": 1, "No": 0, "Prix public": 7}
+MIN_ROW_CELLS = 5
+
+# Runs in the page: maps every row of the matched tables to a record in one evaluation
+_EXTRACT_SCRIPT = """
+(rows, [columns, minCells]) => {
+    const records = [];
+    for (const row of rows) {
+        const cells = row.querySelectorAll("td");
+        if (cells.length < minCells) continue;
+        const record = {};
+        for (const [field, index] of columns) {
+            record[field] = index < cells.length ? cells[index].innerText : "";
+        }
+        records.push(record);
+    }
+    return records;
+}
+"""
+
+
+def rows_to_records(rows, columns=None, min_cells=MIN_ROW_CELLS):
+    """Maps listing rows (lists of cell texts) to records using a {field: column index} mapping."""
+    columns = columns or LISTING_COLUMNS
+    return [
+        {field: row[index] if index < len(row) else "" for field, index in columns.items()}
+        for row in rows
+        if len(row) >= min_cells
+    ]
+
+
+async def extract_table(page, selector="table.listTable", columns=None, min_cells=MIN_ROW_CELLS):
+    """
+    Extracts every row of the tables matching `selector` in a single page evaluation.
+
+    Args:
+        page: The Playwright page.
+        selector: CSS selector of the table(s).
+        columns: {field: column index} mapping, defaults to LISTING_COLUMNS.
+        min_cells: Rows with fewer `td` cells (headers, pagination) are skipped.
+
+    Returns:
+        list: One dict per row, keyed by the fields of `columns`.
+    """
+    columns = columns or LISTING_COLUMNS
+    return await page.eval_on_selector_all(
+        f"{selector} tr", _EXTRACT_SCRIPT, [list(columns.items()), min_cells]
+    )
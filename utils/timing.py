@@ -0,0 +1,136 @@
+"""Per-step timing spans of browser automations, with CSV/JSON export and percentiles."""
+import csv
+import io
+import json
+import shutil
+import time
+from contextlib import contextmanager
+
+from utils.paths import DATA_DIR
+
+TRACES_DIR = DATA_DIR / "traces"
+# Trace directories kept, one per traced run
+MAX_TRACE_RUNS = 10
+# Span of a whole reference (or result page), retries included
+TOTAL_STEP = "total"
+SPAN_FIELDS = ["item", "step", "start", "duration", "ok"]
+
+
+def percentile(values, q):
+    """Returns the q-th percentile (0-100) of `values`, by nearest rank."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))]
+
+
+class StepTimer:
+    """
+    Records how long each step of an automation takes.
+
+    Spans are recorded with `with timer.span("search", reference):` around
+    each step; a step that raises is recorded with ok=False. Start times are
+    seconds since the timer was created.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.spans = []
+
+    @contextmanager
+    def span(self, step, item=None):
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.spans.append({
+                "item": item,
+                "step": step,
+                "start": round(started - self.started_at, 4),
+                "duration": round(time.perf_counter() - started, 4),
+                "ok": ok,
+            })
+
+    def steps(self):
+        """Returns the step names in the order they were first recorded."""
+        return list(dict.fromkeys(span["step"] for span in self.spans))
+
+    def summary(self):
+        """Returns one row per step with its count, total and p50/p95/max durations in seconds."""
+        rows = []
+        for step in self.steps():
+            durations = [span["duration"] for span in self.spans if span["step"] == step]
+            rows.append({
+                "Step": step,
+                "Count": len(durations),
+                "Total (s)": round(sum(durations), 3),
+                "p50 (s)": percentile(durations, 50),
+                "p95 (s)": percentile(durations, 95),
+                "Max (s)": max(durations),
+                "Errors": sum(1 for span in self.spans if span["step"] == step and not span["ok"]),
+            })
+        return rows
+
+    def slowest_items(self, count):
+        """Returns the `count` items with the longest total span, slowest first."""
+        totals = [span for span in self.spans if span["step"] == TOTAL_STEP and span["item"] is not None]
+        return [span["item"] for span in sorted(totals, key=lambda span: span["duration"], reverse=True)[:count]]
+
+    def to_csv(self):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=SPAN_FIELDS)
+        writer.writeheader()
+        writer.writerows(self.spans)
+        return buffer.getvalue()
+
+    def to_json(self):
+        return json.dumps({"spans": self.spans, "summary": self.summary()}, indent=2)
+
+
+class TraceRecorder:
+    """
+    Records a Playwright trace chunk per item and keeps those of the slowest items.
+
+    Tracing is started on each worker context with `start(context)`, and each
+    item is wrapped in `start_chunk(context)` / `stop_chunk(context, item)`.
+    After the run, `keep_slowest` deletes every trace but those of the
+    slowest items. Only the latest MAX_TRACE_RUNS runs are kept on disk.
+    """
+
+    def __init__(self, run_id, keep=5, root=TRACES_DIR):
+        self.keep = keep
+        self.directory = root / run_id
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.paths = {}
+        runs = sorted(root.iterdir(), key=lambda path: path.stat().st_mtime, reverse=True)
+        for old_run in runs[MAX_TRACE_RUNS:]:
+            shutil.rmtree(old_run, ignore_errors=True)
+
+    async def start(self, context):
+        await context.tracing.start(screenshots=True, snapshots=True)
+
+    async def stop(self, context):
+        await context.tracing.stop()
+
+    def _path(self, item):
+        safe = "".join(char if char.isalnum() or char in "-_." else "_" for char in str(item))
+        return self.directory / f"{safe}.zip"
+
+    async def start_chunk(self, context):
+        await context.tracing.start_chunk()
+
+    async def stop_chunk(self, context, item):
+        path = self._path(item)
+        await context.tracing.stop_chunk(path=str(path))
+        self.paths[item] = path
+
+    def keep_slowest(self, timer):
+        """Deletes the traces of all but the `keep` slowest items; returns {item: trace path} of the rest."""
+        slowest = timer.slowest_items(self.keep)
+        for item, path in list(self.paths.items()):
+            if item not in slowest:
+                path.unlink(missing_ok=True)
+                del self.paths[item]
+        return {item: self.paths[item] for item in slowest if item in self.paths}